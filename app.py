@@ -1,19 +1,30 @@
 import os
 import json
+import logging
 import time
 import threading
 from datetime import datetime
 
 from flask import Flask, render_template, jsonify, request, redirect, url_for, flash
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import undefer_group
 
 from exchanges import ExchangeManager
 from spread_calculator import SpreadCalculator, StochasticCalculator
-from models import db, User, Exchange, ArbitrageConfig, TradingPair, TradeLog
+from models import db, User, Exchange, ArbitrageConfig, TradingPair, TradeLog, init_encryption
 from auto_trader import AutoTrader 
 
 # ==================== ИНИЦИАЛИЗАЦИЯ ПРИЛОЖЕНИЯ ====================
 
+# Логирование настраивается только здесь, в точке входа: библиотечные модули
+# (exchanges, auto_trader) лишь получают свои логгеры и не трогают корневой
+logging.basicConfig(
+    level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+    format='%(asctime)s %(levelname)s [%(name)s] %(message)s'
+)
+logger = logging.getLogger('app')
+
 app = Flask(__name__)
 
 # Конфигурация
@@ -26,10 +37,19 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_recycle": 300,
     "pool_pre_ping": True,
 }
+# Пул под параллельные запросы (по умолчанию pool_size=5). Только для серверных СУБД:
+# пул SQLite в памяти (SingletonThreadPool/StaticPool) эти параметры не принимает
+if make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_backend_name() != 'sqlite':
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"].update({
+        "pool_size": 20,
+        "max_overflow": 20,
+        "pool_timeout": 30,
+    })
 app.secret_key = os.environ.get("SESSION_SECRET", os.urandom(24).hex())
 auto_trader = AutoTrader(app, db, ExchangeManager, SpreadCalculator)
 # Инициализация расширений
 db.init_app(app)
+init_encryption(app)
 
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -42,23 +62,23 @@ def load_user(user_id):
 # Создание таблиц и инициализация базовых данных
 with app.app_context():
     db.create_all()
-    print("[STARTUP] Таблицы базы данных созданы.")
+    logger.info("Таблицы базы данных созданы.")
     
     # Инициализация базовых данных, если их нет
     from models import init_default_data
     init_default_data()
-    print("[STARTUP] Базовая конфигурация проверена.")
+    logger.info("Базовая конфигурация проверена.")
 
 # Загрузка конфигурации из файла
 try:
     with open('config.json', 'r') as f:
         config = json.load(f)
-    print("[STARTUP] Конфигурационный файл config.json загружен.")
+    logger.info("Конфигурационный файл config.json загружен.")
 except FileNotFoundError:
-    print("[ERROR] Файл config.json не найден. Создайте его на основе config.example.json")
+    logger.error("Файл config.json не найден. Создайте его на основе config.example.json")
     config = {}
 except json.JSONDecodeError:
-    print("[ERROR] Ошибка в формате config.json. Проверьте JSON-синтаксис.")
+    logger.error("Ошибка в формате config.json. Проверьте JSON-синтаксис.")
     config = {}
 
 # Инициализация основных компонентов
@@ -71,14 +91,14 @@ stochastic_calculator = StochasticCalculator(**config.get('stochastic_settings',
 
 # ==================== АКТИВАЦИЯ КЛЮЧЕЙ ИЗ БАЗЫ ДАННЫХ ====================
 
-print("[STARTUP] Запуск активации API-ключей из БД...")
+logger.info("Запуск активации API-ключей из БД...")
 with app.app_context():
     # ВАЖНО: Используем новую модель Exchange вместо ExchangeAccount
-    active_exchanges = Exchange.query.filter_by(enabled=True).all()
-    print(f"[STARTUP] Найдено {len(active_exchanges)} активных бирж в БД.")
+    active_exchanges = Exchange.query.options(undefer_group('secrets')).filter_by(enabled=True).all()
+    logger.info("Найдено %d активных бирж в БД.", len(active_exchanges))
 
     for exchange_record in active_exchanges:
-        print(f"[STARTUP] Активация: {exchange_record.name} (ID: {exchange_record.id})")
+        logger.info("Активация: %s (ID: %s)", exchange_record.name, exchange_record.id)
         
         # ВАЖНО: Используем новые методы get_api_key() и get_api_secret()
         api_key = exchange_record.get_api_key()
@@ -92,14 +112,18 @@ with app.app_context():
                 api_secret
             )
             status = "УСПЕХ" if success else "ПРОВАЛ"
-            print(f"[STARTUP] Результат для {exchange_record.name}: {status}")
+            logger.info("Результат для %s: %s", exchange_record.name, status)
         else:
-            print(f"[STARTUP] Пропуск {exchange_record.name}: нет ключей в БД.")
+            logger.info("Пропуск %s: нет ключей в БД.", exchange_record.name)
 
-print("[STARTUP] Активация ключей завершена.")
+logger.info("Активация ключей завершена.")
 
 # ==================== ГЛОБАЛЬНОЕ СОСТОЯНИЕ ПРИЛОЖЕНИЯ ====================
 
+def _mask_secrets(data: dict) -> dict:
+    """Копия данных запроса для логов: значения ключей и секретов скрыты."""
+    return {k: '***' if 'secret' in k.lower() or 'key' in k.lower() else v for k, v in data.items()}
+
 app_state = {
     'paused': False,
     'update_interval': config.get('update_interval_ms', 5000),
@@ -112,24 +136,26 @@ app_state = {
 
 def background_price_updater():
     """Фоновая задача для обновления цен и спредов."""
-    print("[BACKGROUND] Фоновый поток ЗАПУЩЕН")
+    logger.info("Фоновый поток обновления цен запущен")
     iteration = 0
     while True:
         iteration += 1
+        cycle_start = time.monotonic()
         
         if not app_state['paused']:
             try:
-                print(f"[BACKGROUND #{iteration}] Запрос цен...")
+                logger.debug("Итерация #%d: запрос цен...", iteration)
                 prices = exchange_manager.fetch_all_prices(app_state['selected_pairs'])
                 
-                # ДИАГНОСТИКА: что пришло от бирж
-                for ex_id, tickers in prices.items():
-                    print(f"[DEBUG] Биржа {ex_id}: {len(tickers)} пар")
-                    for pair, ticker in tickers.items():
-                        if ticker:
-                            print(f"  {pair}: bid={ticker.bid:.2f}, ask={ticker.ask:.2f}")
-                        else:
-                            print(f"  {pair}: НЕТ ДАННЫХ")
+                # ДИАГНОСТИКА: что пришло от бирж (цикл только при уровне DEBUG)
+                if logger.isEnabledFor(logging.DEBUG):
+                    for ex_id, tickers in prices.items():
+                        logger.debug("Биржа %s: %d пар", ex_id, len(tickers))
+                        for pair, ticker in tickers.items():
+                            if ticker:
+                                logger.debug("  %s: bid=%s, ask=%s", pair, ticker.bid, ticker.ask)
+                            else:
+                                logger.debug("  %s: НЕТ ДАННЫХ", pair)
                 
                 
                 # 4. РАСЧЁТ СПРЕДОВ (передаём исходные объекты TickerData)
@@ -150,19 +176,21 @@ def background_price_updater():
                     } for s in spreads
                 ]
                 
-                # 6. Отладочный вывод (можно убрать после проверки)
-                print(f"[Background] Обновлено: {len(prices)} бирж, {len(spreads)} спредов")
+                # 6. Отладочный вывод
+                logger.debug("Обновлено: %d бирж, %d спредов", len(prices), len(spreads))
                 
             except Exception as e:
-                print(f"[BACKGROUND ERROR] Ошибка обновления: {e}")
+                logger.error("Ошибка обновления цен: %s", e)
         
-        # Пауза между итерациями
-        time.sleep(app_state['update_interval'] / 1000)
+        # Пауза между итерациями: интервал отсчитывается от начала опроса,
+        # чтобы время запросов к биржам не добавлялось к периоду обновления
+        cycle_time = time.monotonic() - cycle_start
+        time.sleep(max(0.0, app_state['update_interval'] / 1000 - cycle_time))
 
 # Запуск фонового потока
 price_thread = threading.Thread(target=background_price_updater, daemon=True)
 price_thread.start()
-print("[STARTUP] Фоновый поток для обновления цен запущен.")
+logger.info("Фоновый поток для обновления цен запущен.")
 
 # Инициализация автотрейдера (пока отключён)
 # auto_trader = AutoTrader(exchange_manager, config)  # Раскомментировать при готовности
@@ -301,7 +329,7 @@ def get_state():
         exchanges_state[ex_id] = {
             'name': exchange_obj.config.get('name', ex_id),
             'enabled': exchange_obj.exchange is not None,
-            'is_private': exchange_obj.exchange.apiKey is not None if exchange_obj.exchange else False
+            'is_private': exchange_obj.is_private
         }
     
     return jsonify({
@@ -335,6 +363,19 @@ def set_interval():
     app_state['update_interval'] = max(2000, min(30000, int(interval)))
     return jsonify({'update_interval': app_state['update_interval']})
 
+@app.route('/api/stochastic/<exchange_id>/<path:pair>')
+@login_required
+def get_stochastic(exchange_id, pair):
+    """Свечи и стохастик пары на бирже для графиков."""
+    interval = request.args.get('interval', '15m')
+    klines = exchange_manager.fetch_klines(exchange_id, pair, interval)
+    if klines is None:
+        return jsonify({'error': f'Не удалось получить свечи {pair} на {exchange_id}'}), 502
+    stochastic = stochastic_calculator.calculate(klines)
+    if not stochastic['timestamps']:
+        return jsonify({'error': f'Недостаточно свечей {pair} на {exchange_id} для стохастика'}), 404
+    return jsonify({'stochastic': stochastic})
+
 # ==================== API ДЛЯ УПРАВЛЕНИЯ БИРЖАМИ (Exchange) ====================
 
 @app.route('/api/exchanges', methods=['GET'])
@@ -358,7 +399,8 @@ def add_exchange():
     """Добавление новой биржи с API-ключами (НОВЫЙ формат)."""
     try:
         data = request.get_json()
-        print(f"[DEBUG /api/exchanges] Получены данные: { {k: '***' if 'secret' in k.lower() or 'key' in k.lower() else v for k, v in data.items()} }")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("/api/exchanges: получены данные: %s", _mask_secrets(data))
         
         # Проверяем обязательные поля
         if not data.get('name'):
@@ -387,7 +429,7 @@ def add_exchange():
         
         db.session.add(exchange)
         db.session.commit()
-        print(f"[DEBUG] Биржа {exchange.name} создана в БД (ID: {exchange.id})")
+        logger.debug("Биржа %s создана в БД (ID: %s)", exchange.name, exchange.id)
         
         # Пытаемся сразу активировать подключение
         if exchange.enabled:
@@ -400,7 +442,7 @@ def add_exchange():
                     api_secret
                 )
                 status = "УСПЕХ" if success else "ПРОВАЛ"
-                print(f"[DEBUG] Активация {exchange.name}: {status}")
+                logger.debug("Активация %s: %s", exchange.name, status)
         
         return jsonify({
             'id': exchange.id,
@@ -410,7 +452,7 @@ def add_exchange():
         }), 201
         
     except Exception as e:
-        print(f"[ERROR /api/exchanges] Ошибка: {e}")
+        logger.error("/api/exchanges: ошибка: %s", e)
         return jsonify({'error': f'Внутренняя ошибка: {str(e)}'}), 500
 
 # ==================== СОВМЕСТИМЫЕ РОУТЫ ДЛЯ СТАРОГО ФРОНТЕНДА ====================
@@ -419,8 +461,8 @@ def add_exchange():
 @login_required
 def get_accounts():
     """Совместимый роут для фронтенда (старый формат ExchangeAccount)."""
-    print("[DEBUG /api/accounts] Запрос списка аккаунтов (старый формат)")
-    exchanges = Exchange.query.all()
+    logger.debug("/api/accounts: запрос списка аккаунтов (старый формат)")
+    exchanges = Exchange.query.options(undefer_group('secrets')).all()
     
     # Преобразуем Exchange в старый формат ExchangeAccount
     accounts = []
@@ -445,7 +487,8 @@ def add_account():
     """Совместимый роут для добавления биржи (старый формат)."""
     try:
         data = request.get_json()
-        print(f"[DEBUG /api/accounts] Старый формат, данные: { {k: '***' if 'secret' in k.lower() or 'key' in k.lower() else v for k, v in data.items()} }")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("/api/accounts: старый формат, данные: %s", _mask_secrets(data))
         
         # Проверяем обязательные поля
         if not data.get('exchange_id'):
@@ -475,7 +518,7 @@ def add_account():
         
         db.session.add(exchange)
         db.session.commit()
-        print(f"[DEBUG] Биржа {exchange.name} создана через /api/accounts (ID: {exchange.id})")
+        logger.debug("Биржа %s создана через /api/accounts (ID: %s)", exchange.name, exchange.id)
         
         # Активируем подключение
         if exchange.enabled:
@@ -487,7 +530,7 @@ def add_account():
                     api_key,
                     api_secret
                 )
-                print(f"[DEBUG] Активация {exchange.name}: {'УСПЕХ' if success else 'ПРОВАЛ'}")
+                logger.debug("Активация %s: %s", exchange.name, 'УСПЕХ' if success else 'ПРОВАЛ')
         
         # Возвращаем в старом формате
         return jsonify({
@@ -502,7 +545,7 @@ def add_account():
         }), 201
         
     except Exception as e:
-        print(f"[ERROR /api/accounts] Ошибка: {e}")
+        logger.error("/api/accounts: ошибка: %s", e)
         return jsonify({'error': f'Внутренняя ошибка: {str(e)}'}), 500
 
 @app.route('/api/accounts/<int:account_id>', methods=['DELETE'])
@@ -515,7 +558,7 @@ def delete_account(account_id):
     
     db.session.delete(exchange)
     db.session.commit()
-    print(f"[DEBUG] Биржа {exchange.name} удалена")
+    logger.debug("Биржа %s удалена", exchange.name)
     return jsonify({'success': True})
 
 @app.route('/api/accounts/<int:account_id>/toggle', methods=['POST'])
@@ -528,7 +571,7 @@ def toggle_account(account_id):
     
     exchange.enabled = not exchange.enabled
     db.session.commit()
-    print(f"[DEBUG] Биржа {exchange.name} {'включена' if exchange.enabled else 'выключена'}")
+    logger.debug("Биржа %s %s", exchange.name, 'включена' if exchange.enabled else 'выключена')
     
     # Если включили - активируем ключи
     if exchange.enabled:
@@ -549,10 +592,10 @@ def get_connected_exchanges():
     """Список подключенных бирж (старый формат)."""
     connected = []
     for ex_id, conn in exchange_manager.exchanges.items():
-        if conn.exchange and conn.exchange.apiKey:  # Есть приватные ключи
+        if conn.exchange and conn.is_private:  # Есть приватные ключи
             connected.append(ex_id)
     
-    print(f"[DEBUG /api/connected_exchanges] Подключено: {connected}")
+    logger.debug("/api/connected_exchanges: подключено: %s", connected)
     return jsonify({'connected': connected})
 
 # ==================== ДОПОЛНИТЕЛЬНЫЕ СОВМЕСТИМЫЕ РОУТЫ ====================
@@ -679,12 +722,12 @@ def get_available_pairs():
 
     return jsonify({'pairs': list(available_pairs)})
 if __name__ == '__main__':
-    print(f"[STARTUP] SpreadMaster запускается...")
-    print(f"[STARTUP] Доступные биржи: {list(exchange_manager.exchanges.keys())}")
-    print(f"[STARTUP] Мониторинг пар: {app_state['selected_pairs']}")
-    print(f"[STARTUP] Веб-интерфейс доступен по адресу: http://127.0.0.1:5000")
+    logger.info("SpreadMaster запускается...")
+    logger.info("Доступные биржи: %s", list(exchange_manager.exchanges))
+    logger.info("Мониторинг пар: %s", app_state['selected_pairs'])
+    logger.info("Веб-интерфейс доступен по адресу: http://127.0.0.1:5000")
     
     auto_trader.start()
-    print("[STARTUP] AutoTrader запущен")
+    logger.info("AutoTrader запущен")
     
     app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
\ No newline at end of file
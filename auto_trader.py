@@ -13,7 +13,7 @@ from dataclasses import dataclass
 # Настройка логирования для автотрейдера
 logger = logging.getLogger('auto_trader')
 
-@dataclass
+@dataclass(slots=True)
 class TradeDecision:
     """Результат анализа для принятия торгового решения."""
     action: str  # 'open', 'close', 'hold', 'skip'
@@ -126,14 +126,14 @@ class AutoTrader:
                     
             except Exception as e:
                 self.stats['errors'] += 1
-                logger.error(f"❌ Ошибка в цикле автотрейдера: {e}", exc_info=True)
+                logger.error("❌ Ошибка в цикле автотрейдера: %s", e, exc_info=True)
                 
             # Динамический интервал на основе загрузки
             cycle_time = time.time() - cycle_start
             sleep_time = max(1.0, self.check_interval - cycle_time)
             
             if cycle_time > 5:
-                logger.warning(f"Цикл занял {cycle_time:.2f}с, что много для интервала {self.check_interval}с")
+                logger.warning("Цикл занял %.2fс, что много для интервала %sс", cycle_time, self.check_interval)
                 
             time.sleep(sleep_time)
             
@@ -146,13 +146,13 @@ class AutoTrader:
         from models import AutoTradeSettings, User
         
         settings_list = AutoTradeSettings.query.filter_by(auto_enabled=True).all()
-        logger.debug(f"Найдено {len(settings_list)} пользователей с включенным автотрейдингом")
+        logger.debug("Найдено %s пользователей с включенным автотрейдингом", len(settings_list))
         
         for settings in settings_list:
             try:
                 user = User.query.get(settings.user_id)
                 if not user:
-                    logger.warning(f"Пользователь с ID {settings.user_id} не найден")
+                    logger.warning("Пользователь с ID %s не найден", settings.user_id)
                     continue
                 
                 # Получаем спреды для пользователя
@@ -160,7 +160,7 @@ class AutoTrader:
                 enabled_pairs = user.get_enabled_pairs()
                 
                 if not enabled_exchanges or not enabled_pairs:
-                    logger.debug(f"У пользователя {user.username} нет включенных бирж или пар")
+                    logger.debug("У пользователя %s нет включенных бирж или пар", user.username)
                     continue
                 
                 spreads = self._get_current_spreads(enabled_exchanges, enabled_pairs)
@@ -172,7 +172,7 @@ class AutoTrader:
                 self._make_trading_decisions(settings, user, spreads)
                 
             except Exception as e:
-                logger.error(f"Ошибка обработки пользователя {settings.user_id}: {e}")
+                logger.error("Ошибка обработки пользователя %s: %s", settings.user_id, e)
 
     def _get_current_spreads(self, enabled_exchanges: List[str], enabled_pairs: List[str]) -> List[Dict]:
         """Получение и фильтрация текущих спредов."""
@@ -202,11 +202,11 @@ class AutoTrader:
                                   key=lambda x: x.spread_percent * 0.85,  # Учёт примерных комиссий (~15%)
                                   reverse=True)
             
-            logger.debug(f"Получено {len(sorted_spreads)} спредов после фильтрации")
+            logger.debug("Получено %s спредов после фильтрации", len(sorted_spreads))
             return sorted_spreads
             
         except Exception as e:
-            logger.error(f"Ошибка получения спредов: {e}")
+            logger.error("Ошибка получения спредов: %s", e)
             return []
 
     def _make_trading_decisions(self, settings, user, spreads: List[Dict]):
@@ -255,7 +255,7 @@ class AutoTrader:
                 # Более точный расчёт прибыли (в процентах от сделки)
                 contract.profit = contract.entry_spread - current_spread
                 
-                logger.info(f"🔒 Закрытие контракта {contract.contract_key}: {close_reason}")
+                logger.info("🔒 Закрытие контракта %s: %s", contract.contract_key, close_reason)
                 self.stats['trades_closed'] += 1
         
         self.db.session.commit()
@@ -267,7 +267,7 @@ class AutoTrader:
         ).count()
         
         if active_count >= settings.max_contracts:
-            logger.debug(f"Достигнут лимит контрактов: {active_count}/{settings.max_contracts}")
+            logger.debug("Достигнут лимит контрактов: %s/%s", active_count, settings.max_contracts)
             return
         
         # Получаем ключи существующих активных контрактов
@@ -293,7 +293,7 @@ class AutoTrader:
             if cache_key in self.recent_actions:
                 last_time = self.recent_actions[cache_key]
                 if datetime.now() - last_time < timedelta(minutes=10):
-                    logger.debug(f"Пропускаем {key} - недавно уже открывали")
+                    logger.debug("Пропускаем %s - недавно уже открывали", key)
                     continue
             
             # Дополнительная проверка качества спреда
@@ -324,7 +324,7 @@ class AutoTrader:
             # Сохраняем в кэш
             self.recent_actions[cache_key] = datetime.now()
             
-            logger.info(f"🔓 Открытие контракта {key} при спреде {spread.spread_percent:.3f}%")
+            logger.info("🔓 Открытие контракта %s при спреде %.3f%%", key, spread.spread_percent)
             self.stats['trades_opened'] += 1
         
         self.db.session.commit()
@@ -358,8 +358,8 @@ class AutoTrader:
         """Обновление настроек автотрейдера на лету."""
         if check_interval is not None and 1 <= check_interval <= 60:
             self.check_interval = check_interval
-            logger.info(f"Интервал проверки обновлён: {check_interval}с")
+            logger.info("Интервал проверки обновлён: %sс", check_interval)
         
         if max_position_percent is not None and 0 < max_position_percent <= 100:
             self.risk_manager.max_position_percent = max_position_percent
-            logger.info(f"Максимальный размер позиции обновлён: {max_position_percent}%")
\ No newline at end of file
+            logger.info("Максимальный размер позиции обновлён: %s%%", max_position_percent)
\ No newline at end of file
@@ -3,11 +3,27 @@
 кэшированием и мониторингом здоровья.
 """
 
+import array
+import importlib
+import asyncio
+import socket
+import ssl
+import threading
+import aiohttp
+import certifi
+import requests
+from requests.adapters import HTTPAdapter
 import ccxt
+import numpy as np
+from cachetools import TLRUCache
+import random
+import re
 import time
 import logging
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Set, Tuple
+from dataclasses import dataclass, fields
 from datetime import datetime, timedelta
 from functools import lru_cache
 
@@ -20,10 +36,231 @@ RATE_LIMITS = {
     'okx': 5
 }
 
+# Окно, за которое считаются ошибки и успешные запросы (секунды)
+HEALTH_WINDOW_SECONDS = 3600
+
+# Число попыток запроса в _safe_request
+MAX_REQUEST_ATTEMPTS = 3
+
+# Ограничение одновременных запросов к бирже, если её нет в RATE_LIMITS
+DEFAULT_CONCURRENCY = 5
+
+# Потоков в общем пуле для параллельных синхронных запросов по отдельным парам
+SYNC_FETCH_WORKERS = 16
+
+# Общие настройки экземпляров CCXT; ключи и ccxt_overrides добавляются в connect().
+# CCXT копирует options при создании экземпляра, поэтому словарь можно разделять
+_CCXT_BASE_CONFIG = {
+    'enableRateLimit': True,
+    'options': {'defaultType': 'spot'},
+    'timeout': 30000,
+}
+
+# Таблицы str.translate для вариантов записи пары BTC/USDT
+_STRIP_SLASH = str.maketrans('', '', '/')           # BTCUSDT
+_SLASH_TO_DASH = str.maketrans('/', '-')            # BTC-USDT (OKX)
+_SLASH_TO_UNDERSCORE = str.maketrans('/', '_')      # BTC_USDT (Gate)
+
+# Колонки свечей в порядке CCXT fetch_ohlcv
+KLINE_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+# Политика повторов по типам исключений CCXT: (класс, задержка в секундах).
+# None — ошибка критическая, повтор не нужен. Подклассы идут раньше базовых
+# классов: RateLimitExceeded и DDoSProtection наследуют NetworkError.
+_RETRY_POLICY = (
+    (ccxt.AuthenticationError, None),   # включая PermissionDenied
+    (ccxt.InsufficientFunds, None),
+    (ccxt.BadSymbol, None),
+    (ccxt.RateLimitExceeded, 60.0),
+    (ccxt.DDoSProtection, 30.0),
+    (ccxt.ExchangeNotAvailable, 15.0),  # 5xx и OnMaintenance
+    (ccxt.RequestTimeout, 5.0),
+    (ccxt.NetworkError, 5.0),
+)
+
+# Критические ошибки в тексте исключений, которые CCXT не типизировал
+_CRITICAL_ERROR_RE = re.compile(
+    r'invalid api key|authenticationerror|permission denied|insufficient funds'
+    r'|market does not exist|pair not found',
+    re.IGNORECASE
+)
+
+# Сколько символов текста исключения разбирается (тело HTML-страницы бывает огромным)
+ERROR_MESSAGE_LIMIT = 2048
+
+# Начало HTML-документа в тексте исключения
+_HTML_RE = re.compile(r'<(?:!doctype|html)', re.IGNORECASE)
+
 # Время жизни кэша тикеров (секунды)
 TICKER_CACHE_TTL = 2
 
-@dataclass
+# Сколько секунд отдаётся готовый словарь статуса, если событий не было
+STATUS_CACHE_TTL = 0.5
+
+# Сколько последних замеров длительности запросов хранится для среднего пинга
+PING_SAMPLES = 32
+
+# Как часто перезагружать список рынков биржи (секунды); листинги меняются редко
+MARKETS_REFRESH_SECONDS = 3600
+
+# Общий пул HTTP-соединений асинхронных экземпляров CCXT
+HTTP_POOL_LIMIT = 100
+DNS_CACHE_TTL = 600  # секунд
+# Сколько держать простаивающее соединение (по умолчанию в aiohttp 15с — меньше
+# долгих интервалов опроса, и каждый опрос заново проходил бы TCP+TLS)
+HTTP_KEEPALIVE_TIMEOUT = 75  # секунд
+# Все API бирж доступны по IPv4; без IPv6-адресов не тратится время на попытки
+# соединиться по IPv6 там, где он настроен, но не работает
+HTTP_ADDRESS_FAMILY = socket.AF_INET
+
+# Пул соединений общей requests.Session синхронных экземпляров CCXT:
+# число хостов, для которых хранятся пулы, и размер пула на хост
+SYNC_POOL_CONNECTIONS = 64
+SYNC_POOL_MAXSIZE = 256
+
+# Максимальное число тикеров в кэше одной биржи
+TICKER_CACHE_MAXSIZE = 4096
+
+# Страховочный TTL для тикеров, обновляемых через WebSocket (секунды).
+# Запись обновляется каждым push-сообщением, TTL нужен только на случай
+# «тихого» обрыва потока.
+WS_TICKER_SAFETY_TTL = 5
+
+_async_loop: Optional[asyncio.AbstractEventLoop] = None
+_async_loop_lock = threading.Lock()
+
+
+def _get_async_loop() -> asyncio.AbstractEventLoop:
+    """
+    Возвращает общий фоновый event loop (создаётся лениво).
+    На нём живут асинхронные экземпляры CCXT: WebSocket-подписки и async-запросы.
+    """
+    global _async_loop
+    with _async_loop_lock:
+        if _async_loop is None:
+            _async_loop = asyncio.new_event_loop()
+            threading.Thread(target=_async_loop.run_forever, daemon=True, name="exchanges-async-loop").start()
+        return _async_loop
+
+
+# Одна aiohttp-сессия на все биржи: общий пул соединений и кэш DNS
+_http_session: Optional[aiohttp.ClientSession] = None
+_http_session_lock = threading.Lock()
+
+# Одна requests.Session на синхронные экземпляры всех бирж
+_sync_session: Optional[requests.Session] = None
+_sync_session_lock = threading.Lock()
+
+# Результат пакетного запроса тикеров, отклонённого из-за неизвестной бирже пары (BadSymbol)
+_BAD_SYMBOL = object()
+
+# Общий пул потоков для синхронных запросов по парам (потоки создаются по мере надобности)
+_sync_fetch_pool = ThreadPoolExecutor(max_workers=SYNC_FETCH_WORKERS, thread_name_prefix="exchanges-fetch")
+
+
+@lru_cache(maxsize=None)
+def _get_exchange_class(exchange_id: str, pro: bool = False):
+    """
+    Возвращает класс биржи CCXT, импортируя только её модуль.
+    pro=True — класс из ccxt.pro (REST + WebSocket); пакет ccxt.pro вместе
+    с ccxt.async_support загружается лишь при первом асинхронном подключении.
+    """
+    module = importlib.import_module(f"{'ccxt.pro' if pro else 'ccxt'}.{exchange_id}")
+    return getattr(module, exchange_id)
+
+
+def _get_http_session() -> aiohttp.ClientSession:
+    """Возвращает общую aiohttp-сессию для REST-запросов и WebSocket (создаётся лениво)."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None or _http_session.closed:
+            loop = _get_async_loop()
+            # Те же сертификаты, что CCXT использует для собственных сессий
+            ssl_context = ssl.create_default_context(cafile=certifi.where())
+            connector = aiohttp.TCPConnector(
+                ssl=ssl_context,
+                limit=HTTP_POOL_LIMIT,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+                family=HTTP_ADDRESS_FAMILY,
+                enable_cleanup_closed=True,
+                loop=loop,
+            )
+            _http_session = aiohttp.ClientSession(loop=loop, connector=connector, trust_env=True)
+        return _http_session
+
+
+def _get_sync_session() -> requests.Session:
+    """
+    Возвращает общую requests.Session синхронных экземпляров CCXT (создаётся лениво).
+    Один пул keep-alive соединений на все биржи; повторы здесь не включаются:
+    ими управляет _safe_request.
+    """
+    global _sync_session
+    with _sync_session_lock:
+        if _sync_session is None:
+            session = requests.Session()
+            session.trust_env = False  # как в сессии, которую CCXT создаёт сам
+            adapter = HTTPAdapter(pool_connections=SYNC_POOL_CONNECTIONS, pool_maxsize=SYNC_POOL_MAXSIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sync_session = session
+        return _sync_session
+
+
+def _fmt_msg(head: str, limit: int = 200) -> str:
+    """
+    Короткое описание ошибки по уже усечённому тексту исключения.
+    Ответ биржи в виде HTML-страницы (Cloudflare, 502/500) заменяется пометкой.
+    """
+    # CCXT добавляет перед телом ответа "<id> <метод> <url> <код> <причина>",
+    # поэтому HTML ищем по всему началу сообщения, а не только с первого символа
+    html = _HTML_RE.search(head)
+    if html:
+        prefix = head[:html.start()].strip()
+        return f"{prefix} Ошибка биржи (HTML-ответ, вероятно 502/500)".strip()[:limit]
+    return head[:limit]
+
+
+def _fmt_err(error: BaseException, limit: int = 200) -> str:
+    """Короткое описание ошибки для логов и статуса здоровья (см. _fmt_msg)."""
+    return _fmt_msg(str(error)[:ERROR_MESSAGE_LIMIT], limit)
+
+
+def _klines_to_columns(raw_klines: List[List[float]]) -> Dict[str, np.ndarray]:
+    """
+    Переводит свечи CCXT ([timestamp, open, high, low, close, volume] на строку)
+    в словарь колонок NumPy одним преобразованием массива, без цикла по строкам.
+    """
+    data = np.asarray(raw_klines, dtype=np.float64).reshape(-1, len(KLINE_COLUMNS))
+    columns = {name: data[:, i] for i, name in enumerate(KLINE_COLUMNS)}
+    columns['timestamp'] = columns['timestamp'].astype(np.int64)
+    return columns
+
+
+def _trim_window(timestamps: deque) -> int:
+    """
+    Удаляет из начала очереди события старше HEALTH_WINDOW_SECONDS
+    и возвращает число оставшихся. Амортизированно O(1) на событие.
+    """
+    cutoff = time.monotonic() - HEALTH_WINDOW_SECONDS
+    while timestamps and timestamps[0] <= cutoff:
+        timestamps.popleft()
+    return len(timestamps)
+
+
+def _monotonic_to_iso(moment: Optional[float]) -> Optional[str]:
+    """Переводит отметку time.monotonic() в ISO-время по настенным часам."""
+    if moment is None:
+        return None
+    return (datetime.now() - timedelta(seconds=time.monotonic() - moment)).isoformat()
+
+
+def run_async(coro, timeout: Optional[float] = None):
+    """Выполняет корутину на общем event loop и синхронно возвращает результат."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_async_loop()).result(timeout)
+
+@dataclass(slots=True, frozen=True)
 class TickerData:
     symbol: str
     bid: float
@@ -31,7 +268,7 @@ class TickerData:
     last: float
     timestamp: int
 
-@dataclass
+@dataclass(slots=True)
 class ExchangeHealth:
     """Данные о здоровье подключения к бирже."""
     is_healthy: bool = True
@@ -39,7 +276,10 @@ class ExchangeHealth:
     error_count_1h: int = 0
     success_count_1h: int = 0
     avg_ping_ms: Optional[float] = None
-    last_checked: Optional[datetime] = None
+    last_checked: Optional[float] = None  # time.monotonic() последнего успешного запроса
+
+# Поля ExchangeHealth, отдаваемые в статусе как есть (last_checked сериализуется отдельно)
+_HEALTH_STATUS_FIELDS = tuple(f.name for f in fields(ExchangeHealth) if f.name != 'last_checked')
 
 class RobustExchangeConnection:
     """
@@ -52,35 +292,76 @@ class RobustExchangeConnection:
         self.exchange_id = config['id']
         self.exchange: Optional[ccxt.Exchange] = None
         self.health = ExchangeHealth()
-        self._ticker_cache: Dict[str, Tuple[TickerData, float]] = {}
-        self._last_ping: Optional[float] = None
-        self._error_timestamps: List[datetime] = []
-        self._success_timestamps: List[datetime] = []
+        # Подключение с API-ключами; вычисляется один раз в connect()
+        self.is_private = False
+        # symbol -> (TickerData, TTL в секундах по источнику значения: REST или WebSocket);
+        # ограничен по размеру, просроченные записи удаляются сами.
+        # Пишут в него и синхронные потоки, и event loop, поэтому доступ под блокировкой
+        self._ticker_cache: TLRUCache = TLRUCache(maxsize=TICKER_CACHE_MAXSIZE, ttu=self._ticker_ttu)
+        self._ticker_cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Запросы тикеров, которые уже выполняются: повторный запрос той же пары
+        # дожидается их результата вместо отдельного обращения к бирже
+        self._inflight_tickers: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._async_inflight_tickers: Dict[str, asyncio.Future] = {}
+        # Неизменяемая часть статуса здоровья; is_private обновляется в connect()
+        self._status_base: Dict[str, Any] = {"id": self.exchange_id, "is_private": False}
+        self._exchange_config: Dict[str, Any] = {}
+        # Собранный словарь статуса и момент сборки (time.monotonic);
+        # _status_dirty выставляется при каждом событии, меняющем здоровье
+        self._status_cache: Tuple[float, Dict[str, Any]] = (0.0, {})
+        self._status_dirty = True
+        # Варианты записи пары (BTC/USDT, BTCUSDT, BTC-USDT, ID рынка) -> символ CCXT
+        self._symbol_map: Dict[str, str] = {}
+        # Когда (time.monotonic) рынки последний раз загружены синхронным и async экземплярами
+        self._markets_loaded_at: Optional[float] = None
+        self._async_markets_loaded_at: Optional[float] = None
+        self._async_exchange = None
+        # Асинхронный экземпляр создать не удалось: биржа работает только через REST
+        self._async_unavailable = False
+        self._async_exchange_lock = threading.Lock()
+        # Число одновременных async-запросов к бирже соответствует её лимиту запросов в секунду
+        # До этого момента (time.monotonic) биржа просила не слать запросы (429/DDoS)
+        self._cooldown_until = 0.0
+        concurrency = RATE_LIMITS.get(self.exchange_id, DEFAULT_CONCURRENCY)
+        self._request_semaphore = asyncio.Semaphore(concurrency)
+        self._sync_request_semaphore = threading.BoundedSemaphore(concurrency)
+        self._streamed_symbols: Set[str] = set()
+        # Кольцевой буфер длительностей успешных запросов (мс); заполняется в _safe_request
+        self._ping_ring = array.array('f', [0.0] * PING_SAMPLES)
+        self._ping_idx = 0
+        # Моменты событий (time.monotonic), упорядочены по возрастанию
+        self._error_timestamps: deque = deque()
+        self._success_timestamps: deque = deque()
 
-    def _should_retry(self, error: Exception, attempt: int) -> Tuple[bool, float]:
+    def _should_retry(self, error: Exception, attempt: int,
+                      error_msg: Optional[str] = None) -> Tuple[bool, float]:
         """
         Определяет, нужно ли повторять запрос и какую задержку использовать.
+        error_msg — уже усечённый текст ошибки, если вызывающий его посчитал.
         Возвращает (нужно_ли_повторять, задержка_в_секундах).
         """
-        max_attempts = 3
-        if attempt >= max_attempts:
+        if attempt >= MAX_REQUEST_ATTEMPTS:
             return False, 0
 
-        error_msg = str(error)
-
-        # Критические ошибки, которые не стоит повторять
-        critical_errors = [
-            'Invalid API key',
-            'AuthenticationError',
-            'Permission denied',
-            'Insufficient funds',
-            'Market does not exist',
-            'pair not found'
-        ]
-        for critical in critical_errors:
-            if critical.lower() in error_msg.lower():
-                logger.error(f"Критическая ошибка {self.exchange_id}: {critical}. Повтор не требуется.")
-                return False, 0
+        # Типизированные исключения CCXT: одна проверка isinstance вместо разбора текста
+        for error_class, delay in _RETRY_POLICY:
+            if isinstance(error, error_class):
+                if delay is None:
+                    logger.error("Критическая ошибка %s: %s. Повтор не требуется.",
+                                 self.exchange_id, type(error).__name__)
+                    return False, 0
+                return True, delay
+
+        # Резервный разбор текста для ошибок, которые CCXT не типизировал
+        if error_msg is None:
+            error_msg = str(error)[:ERROR_MESSAGE_LIMIT]
+        critical = _CRITICAL_ERROR_RE.search(error_msg)
+        if critical:
+            logger.error("Критическая ошибка %s: %s. Повтор не требуется.", self.exchange_id, critical.group(0))
+            return False, 0
 
         # Определяем тип ошибки для выбора задержки
         if '502' in error_msg or 'Bad Gateway' in error_msg:
@@ -96,66 +377,123 @@ class RobustExchangeConnection:
             delay = 2.0 * (2 ** attempt)  # 2, 4, 8 секунд
             return True, min(delay, 30)   # Максимум 30 секунд
 
-    def _safe_request(self, request_func, *args, **kwargs):
+    def _handle_request_error(self, error: Exception, attempt: int) -> Tuple[bool, float]:
+        """
+        Регистрирует ошибку запроса и решает, нужен ли повтор.
+        Возвращает (нужно_ли_повторять, задержка_в_секундах) с учётом джиттера.
+        """
+        # Текст ошибки строится и усекается один раз для всех проверок и логов
+        error_msg = str(error)[:ERROR_MESSAGE_LIMIT]
+        self._record_error(error, error_msg)
+
+        # Решаем, повторять ли запрос
+        should_retry, delay = self._should_retry(error, attempt, error_msg)
+        if not should_retry or attempt + 1 >= MAX_REQUEST_ATTEMPTS:
+            # После последней попытки ждать незачем
+            return False, 0
+
+        if isinstance(error, ccxt.DDoSProtection) or '429' in error_msg:
+            # Биржа просит остановиться: остальные запросы к ней на это время
+            # сразу возвращают None вместо того, чтобы каждый ждал свою паузу
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+
+        # Джиттер разводит повторы конкурентных запросов во времени
+        delay *= 0.5 + random.random()
+
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning("Повтор %d/%d для %s. Жду %.1fс. Ошибка: %s",
+                           attempt + 1, MAX_REQUEST_ATTEMPTS, self.exchange_id, delay, _fmt_msg(error_msg, 150))
+        return True, delay
+
+    def _in_cooldown(self) -> bool:
+        """Проверяет, действует ли пауза после ответа 429/DDoS-защиты."""
+        if time.monotonic() < self._cooldown_until:
+            logger.debug("Запрос к %s пропущен: пауза после ограничения запросов", self.exchange_id)
+            return True
+        return False
+
+    def _log_final_failure(self, last_exception: Optional[Exception]):
+        """Логирует запрос, провалившийся после всех попыток."""
+        if last_exception:
+            logger.error("Запрос к %s провалился после %d попыток. Финальная ошибка: %s",
+                         self.exchange_id, MAX_REQUEST_ATTEMPTS, _fmt_err(last_exception))
+
+    def _safe_request(self, request_func, *args, record_ping=False, **kwargs):
         """
         Обертка для запросов к API биржи с повторными попытками и обработкой ошибок.
+        record_ping=True только для лёгких запросов (одиночный тикер): время
+        load_markets и пакетных fetch_tickers не должно попадать в средний пинг.
         """
+        if self._in_cooldown():
+            return None
+
         last_exception = None
 
-        for attempt in range(3):
+        for attempt in range(MAX_REQUEST_ATTEMPTS):
             try:
-                result = request_func(*args, **kwargs)
+                with self._sync_request_semaphore:
+                    start = time.monotonic()
+                    result = request_func(*args, **kwargs)
+                if record_ping:
+                    self._record_ping(start)
                 self._record_success()
                 return result
             except Exception as e:
                 last_exception = e
-                self._record_error(e)
-
-                # Решаем, повторять ли запрос
-                should_retry, delay = self._should_retry(e, attempt)
+                should_retry, delay = self._handle_request_error(e, attempt)
                 if not should_retry:
                     break
-
-                # Если это HTML-ответ (как от Cloudflare), логируем сокращенно
-                error_msg = str(e)
-                if '<!DOCTYPE html>' in error_msg:
-                    log_msg = error_msg.split('\n')[0][:150]
-                    logger.warning(f"Повтор {attempt+1}/3 для {self.exchange_id}: Получен HTML. Жду {delay:.1f}с. Ошибка: {log_msg}...")
-                else:
-                    logger.warning(f"Повтор {attempt+1}/3 для {self.exchange_id}. Жду {delay:.1f}с. Ошибка: {error_msg[:150]}")
-
                 time.sleep(delay)
 
         # Если все попытки исчерпаны
-        if last_exception:
-            # Сокращаем HTML для логов
-            error_msg = str(last_exception)
-            if '<!DOCTYPE html>' in error_msg:
-                error_msg = "Ошибка биржи (HTML-ответ, вероятно 502/500)"
-            logger.error(f"Запрос к {self.exchange_id} провалился после 3 попыток. Финальная ошибка: {error_msg[:200]}")
+        self._log_final_failure(last_exception)
+        return None
+
+    async def _async_safe_request(self, request_func, *args, record_ping=False, **kwargs):
+        """
+        Асинхронный вариант _safe_request для экземпляров ccxt.async_support.
+        Пауза перед повтором не блокирует поток: event loop обслуживает
+        другие биржи, пока эта ждёт. Семафор удерживается только на время
+        самого запроса, поэтому ожидание повтора не занимает слот.
+        """
+        if self._in_cooldown():
+            return None
+
+        last_exception = None
+
+        for attempt in range(MAX_REQUEST_ATTEMPTS):
+            try:
+                async with self._request_semaphore:
+                    start = time.monotonic()
+                    result = await request_func(*args, **kwargs)
+                if record_ping:
+                    self._record_ping(start)
+                self._record_success()
+                return result
+            except Exception as e:
+                last_exception = e
+                should_retry, delay = self._handle_request_error(e, attempt)
+                if not should_retry:
+                    break
+                await asyncio.sleep(delay)
+
+        self._log_final_failure(last_exception)
         return None
 
-    def _record_error(self, error: Exception):
+    def _record_error(self, error: Exception, error_msg: Optional[str] = None):
         """Записывает ошибку в историю и обновляет статус здоровья."""
-        self.health.last_error = str(error)[:200]
+        self.health.last_error = _fmt_err(error) if error_msg is None else _fmt_msg(error_msg)
         self.health.is_healthy = False
-        now = datetime.now()
-        self._error_timestamps.append(now)
-
-        # Очищаем старые ошибки (старше 1 часа)
-        hour_ago = now - timedelta(hours=1)
-        self._error_timestamps = [ts for ts in self._error_timestamps if ts > hour_ago]
-        self.health.error_count_1h = len(self._error_timestamps)
+        self._error_timestamps.append(time.monotonic())
+        self.health.error_count_1h = _trim_window(self._error_timestamps)
+        self._status_dirty = True
 
     def _record_success(self):
         """Отмечает успешный запрос и обновляет здоровье."""
-        now = datetime.now()
-        self._success_timestamps.append(now)
-        # Очищаем старые успехи (старше 1 часа)
-        hour_ago = now - timedelta(hours=1)
-        self._success_timestamps = [ts for ts in self._success_timestamps if ts > hour_ago]
-        self.health.success_count_1h = len(self._success_timestamps)
-        self.health.last_checked = now
+        self._success_timestamps.append(time.monotonic())
+        self.health.success_count_1h = _trim_window(self._success_timestamps)
+        self.health.last_checked = time.monotonic()
+        self._status_dirty = True
 
         # Если подряд было несколько успехов, считаем биржу здоровой
         if self.health.success_count_1h > 5:
@@ -165,116 +503,535 @@ class RobustExchangeConnection:
     def connect(self, api_key: str = '', api_secret: str = '') -> bool:
         """Создаёт и проверяет подключение к бирже."""
         try:
-            exchange_class = getattr(ccxt, self.exchange_id)
+            exchange_class = _get_exchange_class(self.exchange_id)
             exchange_config = {
+                **_CCXT_BASE_CONFIG,
                 'apiKey': api_key,
                 'secret': api_secret,
-                'enableRateLimit': True,
-                'options': {'defaultType': 'spot'},
-                'timeout': 30000,
-                **self.config.get('ccxt_overrides', {})
             }
+            requests_per_second = RATE_LIMITS.get(self.exchange_id)
+            if requests_per_second:
+                # Встроенный в CCXT ограничитель (enableRateLimit) выдерживает паузу
+                # rateLimit мс между запросами и не даёт всплеску запросов получить 429
+                exchange_config['rateLimit'] = 1000 / requests_per_second
+            exchange_config.update(self.config.get('ccxt_overrides', {}))
 
             if not api_key:
                 exchange_config.pop('apiKey', None)
                 exchange_config.pop('secret', None)
-                logger.info(f"Создано публичное подключение к {self.exchange_id}")
+                logger.info("Создано публичное подключение к %s", self.exchange_id)
             else:
-                logger.info(f"Создано приватное подключение к {self.exchange_id}")
+                logger.info("Создано приватное подключение к %s", self.exchange_id)
 
-            self.exchange = exchange_class(exchange_config)
+            self._detach_sync_session()
+            self.exchange = exchange_class({**exchange_config, 'session': _get_sync_session()})
+            self.is_private = bool(api_key)
+            self._status_base["is_private"] = self.is_private
+            self._status_dirty = True
+            self._exchange_config = exchange_config
             self._record_success()
             return True
 
         except Exception as e:
             self._record_error(e)
-            logger.error(f"Ошибка подключения к {self.exchange_id}: {e}")
+            logger.error("Ошибка подключения к %s: %s", self.exchange_id, e)
             return False
 
-    def fetch_ticker(self, symbol: str) -> Optional[TickerData]:
-        """Запрашивает тикер для пары с использованием кэша."""
-        # Проверяем кэш
-        cache_key = symbol
-        if cache_key in self._ticker_cache:
-            ticker, timestamp = self._ticker_cache[cache_key]
-            if time.time() - timestamp < TICKER_CACHE_TTL:
-                return ticker
+    def _build_ticker(self, symbol: str, raw_ticker: Dict[str, Any]) -> TickerData:
+        """Преобразует тикер CCXT в TickerData."""
+        return TickerData(
+            symbol=symbol,
+            bid=raw_ticker.get('bid'),
+            ask=raw_ticker.get('ask'),
+            last=raw_ticker.get('last'),
+            # bookTicker (fetch_bids_asks) времени не отдаёт: ключ есть, но значение None
+            timestamp=raw_ticker.get('timestamp') or int(time.time() * 1000)
+        )
 
+    @staticmethod
+    def _bulk_fetch_method(exchange):
+        """
+        Выбирает запрос, отдающий тикеры многих пар за один вызов:
+        fetch_bids_asks (bookTicker — только лучшие bid/ask, самый лёгкий ответ)
+        или fetch_tickers (полная 24-часовая статистика).
+        None — биржа умеет отдавать тикеры только по одной паре.
+        """
+        if exchange.has.get('fetchBidsAsks'):
+            return exchange.fetch_bids_asks
+        if exchange.has.get('fetchTickers'):
+            return exchange.fetch_tickers
+        return None
+
+    def _get_async_exchange(self):
+        """
+        Возвращает асинхронный экземпляр CCXT на общем event loop (создаётся лениво).
+        Используется класс ccxt.pro: он наследует ccxt.async_support и умеет
+        и REST-запросы, и WebSocket-подписки.
+        """
         if not self.exchange:
-            logger.warning(f"Нет подключения к {self.exchange_id} для запроса тикера {symbol}")
             return None
 
-        # Убедимся, что рынки загружены
+        with self._async_exchange_lock:
+            if self._async_exchange is None and not self._async_unavailable:
+                try:
+                    pro_class = _get_exchange_class(self.exchange_id, pro=True)
+                except (ImportError, AttributeError):
+                    return None
+                try:
+                    # Сессия общая для всех бирж: соединения, TLS и DNS переиспользуются,
+                    # а close() экземпляра её не закрывает (CCXT закрывает только свою)
+                    self._async_exchange = pro_class({
+                        **self._exchange_config,
+                        'asyncio_loop': _get_async_loop(),
+                        'session': _get_http_session(),
+                        'aiohttp_trust_env': True,
+                    })
+                except Exception as e:
+                    # Ошибка касается только этой биржи: она остаётся на синхронном REST
+                    self._async_unavailable = True
+                    logger.warning("Не удалось создать асинхронный экземпляр %s, работа через REST: %s",
+                                   self.exchange_id, _fmt_err(e, 150))
+            return self._async_exchange
+
+    def preload_markets(self):
+        """Заранее загружает рынки асинхронного экземпляра, чтобы первый опрос цен их не ждал."""
+        async_exchange = self._get_async_exchange()
+        if async_exchange is not None:
+            run_async(self._async_ensure_markets(async_exchange))
+
+    def _ensure_stream(self, symbol: str) -> bool:
+        """
+        Запускает WebSocket-подписку на тикер, если биржа поддерживает
+        watch_bids_asks или watch_ticker.
+        Возвращает True, если тикер обновляется через WebSocket.
+        """
+        if symbol in self._streamed_symbols:
+            return True
+
         try:
-            if not hasattr(self.exchange, 'markets') or not self.exchange.markets:
-                self.exchange.load_markets()
+            async_exchange = self._get_async_exchange()
+            if async_exchange is None or not (async_exchange.has.get('watchBidsAsks')
+                                              or async_exchange.has.get('watchTicker')):
+                return False
+
+            self._streamed_symbols.add(symbol)
+            asyncio.run_coroutine_threadsafe(self._watch_ticker_loop(symbol), _get_async_loop())
         except Exception as e:
-            logger.warning(f"Не удалось загрузить рынки для {self.exchange_id}: {e}")
+            self._streamed_symbols.discard(symbol)
+            logger.warning("Не удалось запустить WebSocket-подписку %s на %s: %s", self.exchange_id, symbol, e)
+            return False
 
-        # Выполняем безопасный запрос
+        logger.info("Запущена WebSocket-подписка %s на %s", self.exchange_id, symbol)
+        return True
+
+    async def _watch_ticker_loop(self, symbol: str):
+        """
+        Обновляет кэш тикера при каждом push-сообщении от биржи.
+        Предпочитается поток лучших цен (bookTicker/bbo): он приходит при каждом
+        изменении bid/ask и легче полного тикера с 24-часовой статистикой.
+        """
+        async_exchange = self._async_exchange
+        use_bids_asks = bool(async_exchange.has.get('watchBidsAsks'))
         try:
-            market_symbol = symbol
-            if hasattr(self.exchange, 'market_id'):
-                # Пробуем получить ID рынка, если метод существует
-                try:
-                    market_symbol = self.exchange.market_id(symbol)
-                except:
-                    pass  # Оставляем исходный символ
+            while True:
+                resolved = self._resolve_symbol(symbol)
+                if use_bids_asks:
+                    raw_ticker = (await async_exchange.watch_bids_asks([resolved])).get(resolved)
+                    if not raw_ticker:
+                        continue
+                else:
+                    raw_ticker = await async_exchange.watch_ticker(resolved)
+                self._cache_ticker(symbol, self._build_ticker(symbol, raw_ticker), WS_TICKER_SAFETY_TTL)
+        except Exception as e:
+            logger.warning("WebSocket-подписка %s на %s остановлена: %s", self.exchange_id, symbol, _fmt_err(e, 150))
+        finally:
+            # Следующий fetch_ticker вернётся к REST и попробует переподписаться
+            self._streamed_symbols.discard(symbol)
 
-            raw_ticker = self._safe_request(self.exchange.fetch_ticker, market_symbol)
-            if not raw_ticker:
+    @staticmethod
+    def _ticker_ttu(symbol: str, entry: Tuple[TickerData, float], now: float) -> float:
+        """
+        Срок годности записи кэша по источнику значения, а не по наличию подписки:
+        тикер из REST устаревает через TICKER_CACHE_TTL, даже если поток по паре
+        запущен (или только что оборвался); push-тикеру хватает страховочного TTL.
+        """
+        return now + entry[1]
+
+    def _get_cached_ticker(self, symbol: str) -> Optional[TickerData]:
+        """Возвращает тикер из кэша, если он ещё свежий, и считает попадания/промахи."""
+        with self._ticker_cache_lock:
+            entry = self._ticker_cache.get(symbol)
+            if entry is None:
+                self.cache_misses += 1
                 return None
+            self.cache_hits += 1
+            return entry[0]
 
-            ticker = TickerData(
-                symbol=symbol,
-                bid=raw_ticker.get('bid'),
-                ask=raw_ticker.get('ask'),
-                last=raw_ticker.get('last'),
-                timestamp=raw_ticker.get('timestamp', int(time.time() * 1000))
-            )
+    def _split_cached(self, symbols: List[str]) -> Tuple[Dict[str, TickerData], List[str]]:
+        """Делит пары на свежие тикеры из кэша и пары, которые нужно запросить."""
+        result = {}
+        missing = []
+        for symbol in symbols:
+            cached = self._get_cached_ticker(symbol)
+            if cached:
+                result[symbol] = cached
+            else:
+                missing.append(symbol)
+        return result, missing
 
-            # Сохраняем в кэш
-            self._ticker_cache[cache_key] = (ticker, time.time())
-            return ticker
+    def _cache_ticker(self, symbol: str, ticker: TickerData, ttl: float = TICKER_CACHE_TTL):
+        """Сохраняет тикер в кэш; ttl зависит от источника (REST по умолчанию)."""
+        with self._ticker_cache_lock:
+            self._ticker_cache[symbol] = (ticker, ttl)
 
-        except Exception as e:
+    def _store_tickers(self, raw_tickers: Dict[str, Dict], symbols: List[str]) -> Dict[str, TickerData]:
+        """Сохраняет ответ fetch_tickers в кэш и возвращает тикеры запрошенных пар."""
+        result = {}
+        for symbol in symbols:
+            raw_ticker = raw_tickers.get(self._resolve_symbol(symbol))
+            if raw_ticker:
+                result[symbol] = self._build_ticker(symbol, raw_ticker)
+        with self._ticker_cache_lock:
+            for symbol, ticker in result.items():
+                self._ticker_cache[symbol] = (ticker, TICKER_CACHE_TTL)
+        return result
+
+    def _build_symbol_map(self, markets: Dict[str, Dict]):
+        """
+        Строит словарь вариантов записи спотовых пар в единый символ CCXT,
+        чтобы при каждом запросе разрешать символ одним обращением к словарю.
+        """
+        symbol_map = {}
+        for symbol, market in markets.items():
+            if not market.get('spot', True):
+                continue
+            compact = symbol.translate(_STRIP_SLASH)
+            for variant in (symbol, market.get('id'), compact, compact.lower(),
+                            symbol.translate(_SLASH_TO_DASH), symbol.translate(_SLASH_TO_UNDERSCORE)):
+                if variant:
+                    symbol_map.setdefault(variant, symbol)
+                    symbol_map.setdefault(variant.upper(), symbol)
+        self._symbol_map = symbol_map
+
+    def _resolve_symbol(self, symbol: str) -> str:
+        """Возвращает символ CCXT для пары; неизвестные пары возвращаются как есть."""
+        return self._symbol_map.get(symbol, symbol)
+
+    def _listed_symbols(self, symbols: List[str]) -> List[str]:
+        """
+        Оставляет пары, которые есть среди спотовых рынков биржи. Пакетные запросы
+        CCXT проверяют каждый символ через market(), и одна неизвестная пара
+        (BadSymbol) срывает весь запрос. Пока рынки не загружены, пары не фильтруются.
+        """
+        symbol_map = self._symbol_map
+        if not symbol_map:
+            return symbols
+        listed = [symbol for symbol in symbols if symbol in symbol_map]
+        if len(listed) != len(symbols) and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s не торгует парами: %s", self.exchange_id,
+                         ', '.join(symbol for symbol in symbols if symbol not in symbol_map))
+        return listed
+
+    @staticmethod
+    def _markets_stale(loaded_at: Optional[float]) -> bool:
+        """Проверяет, нужно ли (пере)загрузить рынки."""
+        return loaded_at is None or time.monotonic() - loaded_at > MARKETS_REFRESH_SECONDS
+
+    def _ensure_markets(self):
+        """Загружает рынки биржи один раз и перезагружает их раз в MARKETS_REFRESH_SECONDS."""
+        if not self._markets_stale(self._markets_loaded_at):
+            return
+
+        markets = self._safe_request(self.exchange.load_markets, True)
+        if markets:
+            self._build_symbol_map(markets)
+            self._markets_loaded_at = time.monotonic()
+        else:
+            logger.warning("Не удалось загрузить рынки для %s", self.exchange_id)
+
+    async def _async_ensure_markets(self, async_exchange):
+        """Асинхронный вариант _ensure_markets."""
+        if not self._markets_stale(self._async_markets_loaded_at):
+            return
+
+        markets = await self._async_safe_request(async_exchange.load_markets, True)
+        if markets:
+            self._build_symbol_map(markets)
+            self._async_markets_loaded_at = time.monotonic()
+        else:
+            logger.warning("Не удалось загрузить рынки для %s", self.exchange_id)
+
+    def fetch_ticker(self, symbol: str) -> Optional[TickerData]:
+        """
+        Запрашивает тикер для пары с использованием кэша.
+        Для бирж с WebSocket кэш обновляется push-сообщениями, а REST
+        используется только до первого сообщения или после обрыва потока.
+        """
+        # Проверяем кэш
+        cached = self._get_cached_ticker(symbol)
+        if cached:
+            return cached
+
+        if not self.exchange:
+            logger.warning("Нет подключения к %s для запроса тикера %s", self.exchange_id, symbol)
+            return None
+
+        # Одновременные запросы одной пары из разных потоков объединяются в один
+        with self._inflight_lock:
+            pending = self._inflight_tickers.get(symbol)
+            if pending is None:
+                self._inflight_tickers[symbol] = future = Future()
+        if pending is not None:
+            return pending.result()
+
+        ticker = None
+        try:
+            ticker = self._request_ticker(symbol)
+        except Exception:
             # Ошибка уже обработана в _safe_request
+            pass
+        finally:
+            with self._inflight_lock:
+                del self._inflight_tickers[symbol]
+            future.set_result(ticker)
+        return ticker
+
+    def _request_ticker(self, symbol: str) -> Optional[TickerData]:
+        """Запрашивает тикер у биржи (без кэша) и сохраняет его в кэш."""
+        self._ensure_stream(symbol)
+        self._ensure_markets()
+
+        raw_ticker = self._safe_request(self.exchange.fetch_ticker, self._resolve_symbol(symbol),
+                                        record_ping=True)
+        if not raw_ticker:
             return None
 
+        ticker = self._build_ticker(symbol, raw_ticker)
+
+        # Сохраняем в кэш
+        self._cache_ticker(symbol, ticker)
+        return ticker
+
+    def fetch_tickers(self, symbols: List[str]) -> Dict[str, TickerData]:
+        """
+        Запрашивает тикеры нескольких пар одним запросом (см. _bulk_fetch_method),
+        если биржа его поддерживает; иначе запрашивает пары по одной.
+        Свежие тикеры из кэша повторно не запрашиваются.
+        """
+        result, missing = self._split_cached(symbols)
+
+        if not missing or not self.exchange:
+            return result
+
+        bulk_fetch = self._bulk_fetch_method(self.exchange)
+        if bulk_fetch is None:
+            self._ensure_markets()
+            return self._fetch_each(missing, result)
+
+        self._ensure_markets()
+        missing = self._listed_symbols(missing)
+        if not missing:
+            return result
+        for symbol in missing:
+            self._ensure_stream(symbol)
+
+        raw_tickers = self._safe_request(self._bulk_request, bulk_fetch,
+                                         [self._resolve_symbol(s) for s in missing])
+        if raw_tickers is _BAD_SYMBOL:
+            return self._fetch_each(missing, result)
+        if raw_tickers:
+            result.update(self._store_tickers(raw_tickers, missing))
+        return result
+
+    def _fetch_each(self, symbols: List[str], result: Dict[str, TickerData]) -> Dict[str, TickerData]:
+        """
+        Запрашивает пары по одной и дополняет result.
+        Пары запрашиваются параллельно: время равно самому долгому запросу,
+        а не сумме; одновременность ограничивает семафор в _safe_request.
+        """
+        for symbol, ticker in zip(symbols, _sync_fetch_pool.map(self.fetch_ticker, symbols)):
+            if ticker:
+                result[symbol] = ticker
+        return result
+
+    def _bulk_request(self, bulk_fetch, symbols: List[str]):
+        """
+        Пакетный запрос тикеров. BadSymbol (биржа не знает одну из пар) не повторяется
+        и не считается ошибкой подключения: вызывающий получает _BAD_SYMBOL
+        и запрашивает пары по одной, теряя только неизвестную.
+        """
+        try:
+            return bulk_fetch(symbols)
+        except ccxt.BadSymbol as e:
+            logger.warning("%s отклонила пакетный запрос тикеров, пары будут запрошены по одной: %s",
+                           self.exchange_id, _fmt_err(e, 150))
+            return _BAD_SYMBOL
+
+    async def async_fetch_ticker(self, symbol: str) -> Optional[TickerData]:
+        """Асинхронный вариант fetch_ticker; выполняется на общем event loop."""
+        cached = self._get_cached_ticker(symbol)
+        if cached:
+            return cached
+
+        async_exchange = self._get_async_exchange()
+        if async_exchange is None:
+            logger.warning("Нет подключения к %s для запроса тикера %s", self.exchange_id, symbol)
+            return None
+
+        # Одновременные запросы одной пары объединяются в одну задачу; shield не даёт
+        # отмене одного из ожидающих отменить запрос для остальных
+        task = self._async_inflight_tickers.get(symbol)
+        if task is None:
+            task = asyncio.ensure_future(self._async_request_ticker(async_exchange, symbol))
+            self._async_inflight_tickers[symbol] = task
+            task.add_done_callback(lambda _: self._async_inflight_tickers.pop(symbol, None))
+        return await asyncio.shield(task)
+
+    async def _async_request_ticker(self, async_exchange, symbol: str) -> Optional[TickerData]:
+        """Асинхронный вариант _request_ticker."""
+        self._ensure_stream(symbol)
+        await self._async_ensure_markets(async_exchange)
+
+        raw_ticker = await self._async_safe_request(async_exchange.fetch_ticker, self._resolve_symbol(symbol),
+                                                     record_ping=True)
+        if not raw_ticker:
+            return None
+
+        ticker = self._build_ticker(symbol, raw_ticker)
+        self._cache_ticker(symbol, ticker)
+        return ticker
+
+    async def async_fetch_tickers(self, symbols: List[str]) -> Dict[str, TickerData]:
+        """Асинхронный вариант fetch_tickers; выполняется на общем event loop."""
+        result, missing = self._split_cached(symbols)
+
+        if not missing:
+            return result
+
+        async_exchange = self._get_async_exchange()
+        if async_exchange is None:
+            if not self.exchange:
+                logger.warning("Нет подключения к %s для запроса тикеров", self.exchange_id)
+                return result
+            # Асинхронного экземпляра нет (ccxt.pro не поддерживает биржу или он не создался):
+            # синхронный REST в отдельном потоке, чтобы не блокировать event loop
+            fetched = await asyncio.get_running_loop().run_in_executor(None, self.fetch_tickers, missing)
+            result.update(fetched)
+            return result
+
+        bulk_fetch = self._bulk_fetch_method(async_exchange)
+        if bulk_fetch is None:
+            return await self._async_fetch_each(missing, result)
+
+        await self._async_ensure_markets(async_exchange)
+        missing = self._listed_symbols(missing)
+        if not missing:
+            return result
+        for symbol in missing:
+            self._ensure_stream(symbol)
+
+        raw_tickers = await self._async_safe_request(self._async_bulk_request, bulk_fetch,
+                                                     [self._resolve_symbol(s) for s in missing])
+        if raw_tickers is _BAD_SYMBOL:
+            return await self._async_fetch_each(missing, result)
+        if raw_tickers:
+            result.update(self._store_tickers(raw_tickers, missing))
+        return result
+
+    async def _async_fetch_each(self, symbols: List[str], result: Dict[str, TickerData]) -> Dict[str, TickerData]:
+        """Асинхронный вариант _fetch_each."""
+        tickers = await asyncio.gather(*(self.async_fetch_ticker(symbol) for symbol in symbols))
+        result.update({symbol: ticker for symbol, ticker in zip(symbols, tickers) if ticker})
+        return result
+
+    async def _async_bulk_request(self, bulk_fetch, symbols: List[str]):
+        """Асинхронный вариант _bulk_request."""
+        try:
+            return await bulk_fetch(symbols)
+        except ccxt.BadSymbol as e:
+            logger.warning("%s отклонила пакетный запрос тикеров, пары будут запрошены по одной: %s",
+                           self.exchange_id, _fmt_err(e, 150))
+            return _BAD_SYMBOL
+
     def fetch_balance(self) -> Optional[Dict]:
         """Запрашивает баланс с биржи."""
-        if not self.exchange or not self.exchange.apiKey:
+        if not self.exchange or not self.is_private:
             return None
         return self._safe_request(self.exchange.fetch_balance)
 
-    def measure_ping(self) -> Optional[float]:
-        """Измеряет пинг до сервера биржи."""
+    def fetch_klines(self, symbol: str, timeframe: str = '15m', limit: int = 100) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Запрашивает свечи пары. Возвращает колонки NumPy с ключами KLINE_COLUMNS
+        (от старых свечей к новым) или None, если запрос не удался.
+        """
         if not self.exchange:
             return None
 
-        try:
-            start = time.time()
-            self.exchange.fetch_time()
-            ping_ms = round((time.time() - start) * 1000, 2)
-            self._last_ping = ping_ms
-            self.health.avg_ping_ms = ping_ms if not self.health.avg_ping_ms else (self.health.avg_ping_ms * 0.7 + ping_ms * 0.3)
-            return ping_ms
-        except Exception as e:
-            logger.warning(f"Не удалось измерить пинг для {self.exchange_id}: {e}")
+        self._ensure_markets()
+        raw_klines = self._safe_request(self.exchange.fetch_ohlcv, self._resolve_symbol(symbol), timeframe, None, limit)
+        if raw_klines is None:
+            return None
+        return _klines_to_columns(raw_klines)
+
+    def _record_ping(self, start: float):
+        """Записывает длительность успешного запроса, начатого в момент start, в буфер пинга."""
+        self._ping_ring[self._ping_idx % PING_SAMPLES] = (time.monotonic() - start) * 1000
+        self._ping_idx += 1
+
+    def measure_ping(self) -> Optional[float]:
+        """
+        Возвращает средний пинг до биржи (мс) по последним PING_SAMPLES запросам одиночного тикера.
+        Сетевых запросов не делает: длительности собирает _safe_request(record_ping=True).
+        """
+        count = min(self._ping_idx, PING_SAMPLES)
+        if not count:
             return None
 
+        avg_ping_ms = round(sum(self._ping_ring[:count]) / count, 2)
+        self.health.avg_ping_ms = avg_ping_ms
+        return avg_ping_ms
+
+    def _detach_sync_session(self):
+        """
+        Отвязывает общую requests.Session от синхронного экземпляра CCXT перед тем,
+        как он станет не нужен: Exchange.__del__ в CCXT закрывает свою session.
+        """
+        if self.exchange is not None:
+            self.exchange.session = None
+
+    def close(self):
+        """
+        Останавливает WebSocket-подписки и закрывает асинхронный экземпляр биржи.
+        Общие HTTP-сессии остаются открытыми: ими пользуются другие биржи.
+        """
+        self._detach_sync_session()
+
+        with self._async_exchange_lock:
+            if self._async_exchange is not None:
+                asyncio.run_coroutine_threadsafe(self._async_exchange.close(), _get_async_loop())
+                self._async_exchange = None
+
     def get_health_status(self) -> Dict[str, Any]:
-        """Возвращает текущий статус здоровья биржи."""
-        return {
-            "id": self.exchange_id,
-            "is_healthy": self.health.is_healthy,
-            "last_error": self.health.last_error,
-            "error_count_1h": self.health.error_count_1h,
-            "success_count_1h": self.health.success_count_1h,
-            "avg_ping_ms": self.health.avg_ping_ms,
-            "last_checked": self.health.last_checked.isoformat() if self.health.last_checked else None,
-            "is_private": self.exchange.apiKey is not None if self.exchange else False
-        }
+        """
+        Возвращает текущий статус здоровья биржи.
+        Словарь пересобирается, только если с прошлой сборки были запросы
+        или прошло больше STATUS_CACHE_TTL; изменять его нельзя.
+        """
+        now = time.monotonic()
+        built_at, status = self._status_cache
+        if not self._status_dirty and now - built_at < STATUS_CACHE_TTL:
+            return status
+
+        self._status_dirty = False
+        self.measure_ping()
+        health = self.health
+        status = {name: getattr(health, name) for name in _HEALTH_STATUS_FIELDS}
+        status["last_checked"] = _monotonic_to_iso(health.last_checked)
+        status["cache_hits"] = self.cache_hits
+        status["cache_misses"] = self.cache_misses
+        status.update(self._status_base)
+        self._status_cache = (now, status)
+        return status
 
 # ==================== Менеджер бирж (сохранен публичный API) ====================
 
@@ -289,15 +1046,44 @@ class ExchangeManager:
     def _initialize_exchanges(self):
         """Инициализирует все биржи из конфигурации в режиме публичного доступа."""
         exchanges_config = self.config.get('exchanges', {})
-        for ex_id, ex_config in exchanges_config.items():
-            connection_config = {**ex_config, 'id': ex_id}
-            connection = RobustExchangeConnection(connection_config)
+        if not exchanges_config:
+            return
+
+        connections = [RobustExchangeConnection({**ex_config, 'id': ex_id})
+                       for ex_id, ex_config in exchanges_config.items()]
+
+        # Загрузка рынков — блокирующий HTTP-запрос, поэтому биржи подключаются параллельно:
+        # старт занимает время самой медленной биржи, а не сумму всех
+        with ThreadPoolExecutor(max_workers=len(connections)) as pool:
+            connected = list(pool.map(self._connect_public, connections))
 
-            if connection.connect():  # Публичное подключение без ключей
+        for connection, ok in zip(connections, connected):
+            ex_id = connection.exchange_id
+            if ok:
                 self.exchanges[ex_id] = connection
-                logger.info(f"Биржа {ex_id} готова к работе.")
+                logger.info("Биржа %s готова к работе.", ex_id)
             else:
-                logger.warning(f"Биржа {ex_id} пропущена из-за ошибки инициализации.")
+                logger.warning("Биржа %s пропущена из-за ошибки инициализации.", ex_id)
+
+    @staticmethod
+    def _connect_public(connection: RobustExchangeConnection) -> bool:
+        """Публичное подключение без ключей с предзагрузкой рынков."""
+        if not connection.connect():
+            return False
+        try:
+            connection.preload_markets()
+        except Exception as e:
+            # Рынки загрузятся при первом запросе; остальные биржи это не задерживает
+            logger.warning("Не удалось предзагрузить рынки %s: %s", connection.exchange_id, _fmt_err(e, 150))
+        return True
+
+    def fetch_klines(self, exchange_id: str, symbol: str, timeframe: str = '15m',
+                     limit: int = 100) -> Optional[Dict[str, np.ndarray]]:
+        """Запрашивает свечи пары на бирже (см. RobustExchangeConnection.fetch_klines)."""
+        connection = self.get_exchange(exchange_id)
+        if not connection:
+            return None
+        return connection.fetch_klines(symbol, timeframe, limit)
 
     def get_exchange(self, exchange_id: str) -> Optional[RobustExchangeConnection]:
         """Возвращает объект подключения к бирже по её ID."""
@@ -306,7 +1092,7 @@ class ExchangeManager:
     def set_exchange_credentials(self, exchange_id: str, api_key: str, api_secret: str) -> bool:
         """Обновляет биржу для работы с приватными ключами."""
         if exchange_id not in self.exchanges:
-            logger.error(f"Биржа {exchange_id} не найдена.")
+            logger.error("Биржа %s не найдена.", exchange_id)
             return False
 
         # Закрываем старое подключение, если оно было
@@ -317,9 +1103,10 @@ class ExchangeManager:
 
         if success:
             self.exchanges[exchange_id] = new_connection
-            logger.info(f"Приватные ключи для {exchange_id} успешно установлены.")
+            old_connection.close()
+            logger.info("Приватные ключи для %s успешно установлены.", exchange_id)
         else:
-            logger.error(f"Не удалось установить приватные ключи для {exchange_id}.")
+            logger.error("Не удалось установить приватные ключи для %s.", exchange_id)
             # Оставляем старую публичную сессию
             old_connection.connect()  # Переподключаемся в публичном режиме
 
@@ -329,35 +1116,49 @@ class ExchangeManager:
         """
         Запрашивает цены для всех пар на всех биржах.
         Возвращает словарь: {exchange_id: {symbol: TickerData}}
-        """
-        results = {}
 
-        for ex_id, connection in self.exchanges.items():
-            if not connection.exchange:
-                continue
+        Синхронная обёртка над fetch_all_prices_async: запросы выполняются
+        конкурентно на общем event loop, поэтому время опроса определяется
+        самой медленной биржей, а не суммой всех запросов. Лимиты запросов
+        у каждой биржи свои и соблюдаются CCXT (enableRateLimit), поэтому
+        пауза между биржами не нужна.
+        """
+        return run_async(self.fetch_all_prices_async(symbols))
 
-            results[ex_id] = {}
-            for symbol in symbols:
-                ticker = connection.fetch_ticker(symbol)
-                if ticker:
-                    results[ex_id][symbol] = ticker
-                # Если тикер не получен, просто не добавляем его. Ошибка уже залогирована.
+    async def fetch_all_prices_async(self, symbols: List[str]) -> Dict[str, Dict[str, TickerData]]:
+        """
+        Асинхронный вариант fetch_all_prices: биржи опрашиваются конкурентно
+        через asyncio.gather, а каждая биржа отдаёт все пары одним запросом
+        fetch_tickers (если поддерживает).
+        Вызывать на общем event loop (см. run_async).
+        """
+        connections = [(ex_id, conn) for ex_id, conn in self.exchanges.items() if conn.exchange]
+        tickers = await asyncio.gather(
+            *(conn.async_fetch_tickers(symbols) for _, conn in connections),
+            return_exceptions=True
+        )
 
-            # Небольшая пауза между запросами к разным биржам, чтобы снизить нагрузку
-            time.sleep(0.1)
+        results = {}
+        for (ex_id, _), ex_tickers in zip(connections, tickers):
+            if isinstance(ex_tickers, Exception):
+                logger.warning("Ошибка запроса цен на %s: %s", ex_id, _fmt_err(ex_tickers, 150))
+                ex_tickers = {}
+            # Если тикер не получен, просто не добавляем его. Ошибка уже залогирована.
+            results[ex_id] = ex_tickers
 
         return results
 
+    def close(self):
+        """Закрывает асинхронные экземпляры и WebSocket-подписки всех бирж."""
+        for connection in self.exchanges.values():
+            connection.close()
+
     def get_exchange_status(self, exchange_id: str) -> Dict[str, Any]:
         """Возвращает детальный статус биржи."""
         connection = self.get_exchange(exchange_id)
         if not connection:
             return {"error": "Биржа не найдена"}
 
-        # Если пинг не измерялся, измеряем
-        if connection.health.avg_ping_ms is None:
-            connection.measure_ping()
-
         return connection.get_health_status()
 
     def get_all_statuses(self) -> Dict[str, Dict[str, Any]]:
@@ -1,8 +1,10 @@
 import sys
 import os
 sys.path.append('.')
+from cryptography.fernet import Fernet
+from sqlalchemy.orm import load_only
 from app import app, db
-from models import ExchangeAccount, get_encryption_key, decrypt_value
+from models import Exchange, get_encryption_key, _get_legacy_encryption_key, _LEGACY_PBKDF2
 
 print("="*50)
 print("ФИНАЛЬНАЯ ДИАГНОСТИКА КЛЮЧЕЙ В БАЗЕ")
@@ -16,43 +18,58 @@ with app.app_context():
     if not secret_from_env or secret_from_env == 'ваш_секретный_ключ_шифрования':
         print("   ⚠️  КРИТИЧЕСКАЯ ОШИБКА: Ключ не установлен или остался шаблонным!")
     
-    # 2. Проверяем ключи шифрования
+    # 2. Проверяем ключи шифрования: текущий (HKDF) и прежние (PBKDF2),
+    # которыми модель расшифровывает старые записи
+    fernets = []
     try:
-        fernet = get_encryption_key()
-        print(f"2. Объект для шифрования создан: {'ДА' if fernet else 'НЕТ'}")
+        secret_key = app.config['SECRET_KEY']
+        fernets.append(("текущий ключ", Fernet(get_encryption_key(secret_key))))
+        for index, (algorithm, iterations) in enumerate(_LEGACY_PBKDF2):
+            fernets.append((f"прежний ключ #{index} ({algorithm.name}, {iterations})",
+                            Fernet(_get_legacy_encryption_key(secret_key, index))))
+        print(f"2. Объектов для шифрования создано: {len(fernets)}")
     except Exception as e:
         print(f"2. Ошибка при создании объекта шифрования: {e}")
     
-    # 3. Проверяем записи в БД
-    accounts = ExchangeAccount.query.filter_by(is_active=True).all()
-    print(f"3. Найдено активных записей в exchange_accounts: {len(accounts)}")
+    # 3. Проверяем записи в БД: один запрос только с нужными колонками
+    accounts = (Exchange.query
+                .options(load_only(Exchange.id, Exchange.name,
+                                   Exchange.api_key_encrypted, Exchange.api_secret_encrypted))
+                .filter_by(enabled=True)
+                .all())
+    print(f"3. Найдено активных записей в exchanges: {len(accounts)}")
     
     for acc in accounts:
-        print(f"\n   Проверяем аккаунт ID={acc.id}, Биржа='{acc.exchange_id}':")
+        print(f"\n   Проверяем аккаунт ID={acc.id}, Биржа='{acc.name}':")
         print(f"   - Зашифрованный API Key (первые 20 симв.): '{acc.api_key_encrypted[:20] if acc.api_key_encrypted else 'ПУСТО'}...'")
         print(f"   - Длина зашифрованного ключа: {len(acc.api_key_encrypted) if acc.api_key_encrypted else 0}")
         
-        # 4. Пробуем расшифровать ПРЯМО через decrypt_value (минуя get_credentials)
-        try:
-            if acc.api_key_encrypted:
-                decrypted_test = decrypt_value(acc.api_key_encrypted)
-                print(f"   - ПРЯМАЯ расшифровка через decrypt_value(): УСПЕХ")
+        # 4. Пробуем расшифровать ПРЯМО объектами из шага 2 (минуя методы модели)
+        if acc.api_key_encrypted and fernets:
+            last_error = None
+            for label, fernet in fernets:
+                try:
+                    decrypted_test = fernet.decrypt(acc.api_key_encrypted.encode()).decode()
+                except Exception as e:
+                    last_error = e
+                    continue
+                print(f"   - ПРЯМАЯ расшифровка через Fernet.decrypt(): УСПЕХ ({label})")
                 print(f"     Расшифровано (первые 5 символов): '{decrypted_test[:5]}...'")
+                break
             else:
-                print(f"   - ПРЯМАЯ расшифровка: Поле пустое")
-        except Exception as e:
-            print(f"   - ПРЯМАЯ расшифровка через decrypt_value(): ОШИБКА - {type(e).__name__}: {e}")
+                print(f"   - ПРЯМАЯ расшифровка через Fernet.decrypt(): ОШИБКА ни одним ключом - {type(last_error).__name__}: {last_error}")
+        else:
+            print(f"   - ПРЯМАЯ расшифровка: Поле пустое")
         
-        # 5. Пробуем через get_credentials
-        print(f"   - Вызов get_credentials()...")
+        # 5. Пробуем через методы модели
+        print(f"   - Вызов get_api_key() / get_api_secret()...")
         try:
-            creds = acc.get_credentials()
-            if creds:
-                print(f"   - get_credentials() вернул: УСПЕХ")
+            if acc.get_api_key() and acc.get_api_secret():
+                print(f"   - get_api_key() / get_api_secret() вернули: УСПЕХ")
             else:
-                print(f"   - get_credentials() вернул: None (без ошибки)")
+                print(f"   - get_api_key() / get_api_secret() вернули пустое значение (без ошибки)")
         except Exception as e:
-            print(f"   - get_credentials() вызвал ИСКЛЮЧЕНИЕ: {type(e).__name__}: {e}")
+            print(f"   - get_api_key() / get_api_secret() вызвали ИСКЛЮЧЕНИЕ: {type(e).__name__}: {e}")
 
 print("\n" + "="*50)
 print("ДИАГНОСТИКА ЗАВЕРШЕНА")
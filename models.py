@@ -4,38 +4,259 @@
 """
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.orm import deferred, validates
 from datetime import datetime, timedelta
 import base64
+import hmac
 import secrets
-from cryptography.fernet import Fernet
+from functools import lru_cache
+from operator import attrgetter
+from typing import Iterable, List
+from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+    _password_hasher = PasswordHasher()
+except ImportError:
+    _password_hasher = None
+
 db = SQLAlchemy()
 
 
 # ==================== УТИЛИТЫ ШИФРОВАНИЯ ====================
 
+_KDF_SALT = b'spreadmaster_salt_'
+
+
+@lru_cache(maxsize=4)
 def get_encryption_key(secret_key: str) -> bytes:
     """
-    Генерирует ключ шифрования из Flask secret key.
-    Использует PBKDF2 для безопасного преобразования.
+    Генерирует ключ шифрования из Flask secret key через HKDF-SHA256.
+    Результат кэшируется: для одного secret key ключ выводится один раз за процесс.
+
+    Это KDF над серверным секретом с высокой энтропией, а не хэширование
+    пароля пользователя: перебор по словарю здесь не угроза, поэтому
+    растягивание ключа (PBKDF2) не нужно — HKDF достаточно и практически бесплатен.
     """
-    salt = b'spreadmaster_salt_'
-    
-    kdf = PBKDF2HMAC(
+    kdf = HKDF(
         algorithm=hashes.SHA256(),
         length=32,
-        salt=salt,
-        iterations=100000,
+        salt=_KDF_SALT,
+        info=b'spreadmaster-fernet',
     )
     
     key = base64.urlsafe_b64encode(kdf.derive(secret_key.encode()))
     return key
 
 
+# Параметры PBKDF2, которыми ключ выводился раньше (от новых к старым);
+# нужны только для расшифровки записей, сохранённых до перехода на HKDF
+_LEGACY_PBKDF2 = (
+    (hashes.SHA512, 10000),
+    (hashes.SHA256, 100000),
+)
+
+
+@lru_cache(maxsize=8)
+def _get_legacy_encryption_key(secret_key: str, index: int) -> bytes:
+    """Прежний ключ по параметрам _LEGACY_PBKDF2[index]."""
+    algorithm, iterations = _LEGACY_PBKDF2[index]
+    kdf = PBKDF2HMAC(
+        algorithm=algorithm(),
+        length=32,
+        salt=_KDF_SALT,
+        iterations=iterations,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(secret_key.encode()))
+
+
+@lru_cache(maxsize=8)
+def _get_legacy_fernet(secret_key: str, index: int) -> Fernet:
+    """Fernet с прежним ключом _LEGACY_PBKDF2[index] (один на процесс)."""
+    return Fernet(_get_legacy_encryption_key(secret_key, index))
+
+
+class _Cipher:
+    """
+    Шифрует текущим ключом; при расшифровке, если токен не подходит,
+    по очереди пробует прежние ключи. Прежние ключи выводятся лениво —
+    только когда в базе действительно встретилась старая запись.
+    """
+    
+    __slots__ = ('_secret_key', '_fernet')
+    
+    def __init__(self, secret_key: str):
+        self._secret_key = secret_key
+        self._fernet = Fernet(get_encryption_key(secret_key))
+    
+    def encrypt(self, data: bytes) -> bytes:
+        return self._fernet.encrypt(data)
+    
+    def decrypt(self, token: bytes) -> bytes:
+        try:
+            return self._fernet.decrypt(token)
+        except InvalidToken:
+            pass
+        
+        for index in range(len(_LEGACY_PBKDF2)):
+            try:
+                return _get_legacy_fernet(self._secret_key, index).decrypt(token)
+            except InvalidToken:
+                continue
+        raise InvalidToken
+
+
+@lru_cache(maxsize=4)
+def _get_cipher(secret_key: str) -> _Cipher:
+    """Возвращает объект шифрования для secret key (один на процесс)."""
+    return _Cipher(secret_key)
+
+
+# SECRET_KEY приложения, запомненный при старте (см. init_encryption)
+_secret_key = None
+
+
+def init_encryption(app) -> None:
+    """
+    Запоминает SECRET_KEY приложения, чтобы Exchange.cipher не обращался
+    к current_app на каждое шифрование/расшифровку.
+    """
+    global _secret_key
+    _secret_key = app.config.get('SECRET_KEY') or None
+
+
+def get_cipher() -> _Cipher:
+    """
+    Объект шифрования для SECRET_KEY приложения: запомненного init_encryption,
+    иначе из current_app. Ключ выводится один раз на процесс (см. _get_cipher).
+    """
+    secret_key = _secret_key
+    if secret_key is None:
+        from flask import current_app
+        secret_key = current_app.config.get('SECRET_KEY')
+    
+    if not secret_key:
+        raise ValueError("SECRET_KEY не установлен в конфигурации Flask")
+    
+    return _get_cipher(secret_key)
+
+
+def encrypt_value(value: str) -> str:
+    """Шифрует строку ключом приложения; пустое значение -> пустая строка."""
+    if not value:
+        return ""
+    return get_cipher().encrypt(value.encode()).decode()
+
+
+def decrypt_value(token: str) -> str:
+    """
+    Расшифровывает строку ключом приложения; пустое значение -> пустая строка.
+    Ошибка расшифровки (InvalidToken) пробрасывается вызывающему.
+    """
+    if not token:
+        return ""
+    return get_cipher().decrypt(token.encode()).decode()
+
+
+def decrypt_many(secret_key: str, ciphertexts: Iterable[str]) -> List[str]:
+    """
+    Расшифровывает несколько значений одним объектом Fernet.
+    Пустые значения возвращаются как пустые строки; ошибка расшифровки
+    (cryptography.fernet.InvalidToken) пробрасывается вызывающему.
+    """
+    fernet = _get_cipher(secret_key)
+    return [fernet.decrypt(value.encode()).decode() if value else "" for value in ciphertexts]
+
+
+class EncryptedField:
+    """
+    Дескриптор зашифрованного значения, хранящегося в колонке `column`.
+    Чтение расшифровывает (пустая строка, если значения нет или оно не
+    расшифровывается), запись шифрует (пустое значение сохраняется как None).
+    Объект шифрования берётся из `obj.cipher`.
+    """
+    
+    __slots__ = ('column', 'label')
+    
+    def __init__(self, column: str, label: str):
+        self.column = column
+        self.label = label
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        token = getattr(obj, self.column)
+        if not token:
+            return ""
+        try:
+            return obj.cipher.decrypt(token.encode()).decode()
+        except Exception:
+            return ""
+    
+    def __set__(self, obj, value):
+        setattr(obj, self.column, self.encrypt(value, obj.cipher if value else None))
+    
+    def encrypt(self, value: str, cipher):
+        """Шифрует значение заданным объектом шифрования."""
+        if not value:
+            return None
+        try:
+            return cipher.encrypt(value.encode()).decode()
+        except Exception as e:
+            raise ValueError(f"Ошибка шифрования {self.label}: {e}")
+
+
+def _iso(value):
+    """datetime -> ISO-строка для to_dict (None остаётся None)."""
+    return value.isoformat() if value is not None else None
+
+
+@lru_cache(maxsize=256)
+def _split_csv(value: str) -> tuple:
+    """
+    Разбор строки вида 'a, b,c' в кортеж непустых элементов.
+    Кэшируется по самой строке: повторные вызовы для тех же настроек
+    пользователя не разбирают её заново, а изменение значения даёт новый ключ.
+    """
+    return tuple(item for item in (part.strip() for part in value.split(',')) if item)
+
+
+# ==================== ВРЕМЯ НА СТОРОНЕ БД ====================
+
+class utcnow(FunctionElement):
+    """
+    Текущее время БД в UTC. Все DateTime-колонки naive и хранят UTC —
+    как datetime.utcnow() в коде приложения; func.now() этого не гарантирует
+    (в PostgreSQL он возвращает время в часовом поясе сессии).
+    """
+    type = db.DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    # SQLite: CURRENT_TIMESTAMP всегда в UTC
+    return 'CURRENT_TIMESTAMP'
+
+
+@compiles(utcnow, 'postgresql')
+def _utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow, 'mysql')
+def _utcnow_mysql(element, compiler, **kw):
+    return 'UTC_TIMESTAMP()'
+
+
 # ==================== МОДЕЛЬ ПОЛЬЗОВАТЕЛЯ ====================
 
 class User(db.Model, UserMixin):
@@ -57,18 +278,28 @@ class User(db.Model, UserMixin):
     reset_token = db.Column(db.String(100), nullable=True)
     reset_token_expiry = db.Column(db.DateTime, nullable=True)
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=utcnow(), server_default=utcnow())
     last_login = db.Column(db.DateTime, nullable=True)
     
     def __repr__(self):
         return f'<User {self.username}>'
     
     def set_password(self, password: str):
-        """Установка хэша пароля."""
-        self.password_hash = generate_password_hash(password)
+        """Установка хэша пароля (argon2id, если установлен argon2-cffi)."""
+        if _password_hasher is not None:
+            self.password_hash = _password_hasher.hash(password)
+        else:
+            self.password_hash = generate_password_hash(password, method='scrypt')
     
     def check_password(self, password: str) -> bool:
-        """Проверка пароля."""
+        """Проверка пароля; старые хэши Werkzeug по-прежнему принимаются."""
+        if self.password_hash.startswith('$argon2'):
+            if _password_hasher is None:
+                return False
+            try:
+                return _password_hasher.verify(self.password_hash, password)
+            except (VerificationError, InvalidHashError):
+                return False
         return check_password_hash(self.password_hash, password)
     
     def generate_reset_token(self, expires_in: int = 3600) -> str:
@@ -79,7 +310,8 @@ class User(db.Model, UserMixin):
     
     def verify_reset_token(self, token: str) -> bool:
         """Проверка токена сброса пароля."""
-        if (self.reset_token == token and 
+        if (self.reset_token and token and
+            hmac.compare_digest(self.reset_token.encode(), token.encode()) and
             self.reset_token_expiry and 
             self.reset_token_expiry > datetime.utcnow()):
             return True
@@ -90,17 +322,26 @@ class User(db.Model, UserMixin):
         self.reset_token = None
         self.reset_token_expiry = None
     
+    @validates('enabled_exchanges', 'enabled_pairs')
+    def _normalize_csv(self, key, value):
+        """Хранит списки в каноническом виде 'a,b,c' (принимает строку или список)."""
+        if value is None:
+            return value
+        if isinstance(value, str):
+            return ','.join(_split_csv(value))
+        return ','.join(item.strip() for item in value if item and item.strip())
+    
     def get_enabled_exchanges(self) -> list:
         """Получение списка включённых бирж пользователя."""
         if not self.enabled_exchanges:
             return []
-        return [ex.strip() for ex in self.enabled_exchanges.split(',') if ex.strip()]
+        return list(_split_csv(self.enabled_exchanges))
     
     def get_enabled_pairs(self) -> list:
         """Получение списка включённых торговых пар пользователя."""
         if not self.enabled_pairs:
             return []
-        return [pair.strip() for pair in self.enabled_pairs.split(',') if pair.strip()]
+        return list(_split_csv(self.enabled_pairs))
     
     def to_dict(self) -> dict:
         """Сериализация пользователя в словарь."""
@@ -111,8 +352,8 @@ class User(db.Model, UserMixin):
             'enabled_exchanges': self.get_enabled_exchanges(),
             'enabled_pairs': self.get_enabled_pairs(),
             'update_interval': self.update_interval,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None
+            'created_at': _iso(self.created_at),
+            'last_login': _iso(self.last_login)
         }
 
 
@@ -126,18 +367,25 @@ class Exchange(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False, unique=True)
     display_name = db.Column(db.String(100), nullable=False)
-    api_key_encrypted = db.Column(db.Text, nullable=True)
-    api_secret_encrypted = db.Column(db.Text, nullable=True)
-    password_encrypted = db.Column(db.Text, nullable=True)
+    # Шифротексты грузятся только при обращении (одним запросом на все три),
+    # чтобы списки бирж не тянули их из БД; см. undefer_group('secrets')
+    api_key_encrypted = deferred(db.Column(db.Text, nullable=True), group='secrets')
+    api_secret_encrypted = deferred(db.Column(db.Text, nullable=True), group='secrets')
+    password_encrypted = deferred(db.Column(db.Text, nullable=True), group='secrets')
     enabled = db.Column(db.Boolean, default=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = db.Column(db.DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
     
     # Настройки конкретной биржи
     testnet = db.Column(db.Boolean, default=False)
     rate_limit = db.Column(db.Integer, default=1000)
     timeout = db.Column(db.Integer, default=30000)
     
+    # Расшифрованные значения (хранятся в колонках *_encrypted)
+    api_key = EncryptedField('api_key_encrypted', "API ключа")
+    api_secret = EncryptedField('api_secret_encrypted', "API секрета")
+    password = EncryptedField('password_encrypted', "пароля")
+    
     def __init__(self, *args, **kwargs):
         """Инициализация с автоматическим шифрованием ключей."""
         api_key = kwargs.pop('api_key', None)
@@ -146,111 +394,48 @@ class Exchange(db.Model):
         
         super().__init__(*args, **kwargs)
         
-        if api_key:
-            self.set_api_key(api_key)
-        if api_secret:
-            self.set_api_secret(api_secret)
-        if password:
-            self.set_password(password)
+        if api_key or api_secret or password:
+            # Один объект шифрования на все три секрета
+            cipher = self.cipher
+            for field, value in ((Exchange.api_key, api_key),
+                                 (Exchange.api_secret, api_secret),
+                                 (Exchange.password, password)):
+                if value:
+                    setattr(self, field.column, field.encrypt(value, cipher))
     
     @property
     def cipher(self):
         """Возвращает объект шифрования."""
-        from flask import current_app
-        secret_key = current_app.config.get('SECRET_KEY')
-        
-        if not secret_key:
-            raise ValueError("SECRET_KEY не установлен в конфигурации Flask")
-        
-        encryption_key = get_encryption_key(secret_key)
-        return Fernet(encryption_key)
+        return get_cipher()
+    
+    @property
+    def _has_any_secret(self) -> bool:
+        """Есть ли хотя бы один сохранённый шифротекст."""
+        return bool(self.api_key_encrypted or self.api_secret_encrypted or self.password_encrypted)
     
     def set_api_key(self, api_key: str):
         """Шифрование и сохранение API ключа."""
-        if not api_key:
-            self.api_key_encrypted = None
-            return
-        
-        try:
-            self.api_key_encrypted = self.cipher.encrypt(api_key.encode()).decode()
-        except Exception as e:
-            from flask import current_app
-            if current_app.config.get('DEBUG'):
-                self.api_key_encrypted = api_key
-            else:
-                raise ValueError(f"Ошибка шифрования API ключа: {e}")
+        self.api_key = api_key
     
     def get_api_key(self) -> str:
         """Расшифровка API ключа."""
-        if not self.api_key_encrypted:
-            return ""
-        
-        try:
-            if not self.api_key_encrypted.startswith('gAAA'):
-                return self.api_key_encrypted
-            
-            decrypted = self.cipher.decrypt(self.api_key_encrypted.encode())
-            return decrypted.decode()
-        except Exception:
-            return ""
+        return self.api_key
     
     def set_api_secret(self, api_secret: str):
         """Шифрование и сохранение API секрета."""
-        if not api_secret:
-            self.api_secret_encrypted = None
-            return
-        
-        try:
-            self.api_secret_encrypted = self.cipher.encrypt(api_secret.encode()).decode()
-        except Exception as e:
-            from flask import current_app
-            if current_app.config.get('DEBUG'):
-                self.api_secret_encrypted = api_secret
-            else:
-                raise ValueError(f"Ошибка шифрования API секрета: {e}")
+        self.api_secret = api_secret
     
     def get_api_secret(self) -> str:
         """Расшифровка API секрета."""
-        if not self.api_secret_encrypted:
-            return ""
-        
-        try:
-            if not self.api_secret_encrypted.startswith('gAAA'):
-                return self.api_secret_encrypted
-            
-            decrypted = self.cipher.decrypt(self.api_secret_encrypted.encode())
-            return decrypted.decode()
-        except Exception:
-            return ""
+        return self.api_secret
     
     def set_password(self, password: str):
         """Шифрование и сохранение пароля."""
-        if not password:
-            self.password_encrypted = None
-            return
-        
-        try:
-            self.password_encrypted = self.cipher.encrypt(password.encode()).decode()
-        except Exception as e:
-            from flask import current_app
-            if current_app.config.get('DEBUG'):
-                self.password_encrypted = password
-            else:
-                raise ValueError(f"Ошибка шифрования пароля: {e}")
+        self.password = password
     
     def get_password(self) -> str:
         """Расшифровка пароля."""
-        if not self.password_encrypted:
-            return ""
-        
-        try:
-            if not self.password_encrypted.startswith('gAAA'):
-                return self.password_encrypted
-            
-            decrypted = self.cipher.decrypt(self.password_encrypted.encode())
-            return decrypted.decode()
-        except Exception:
-            return ""
+        return self.password
     
     def to_dict(self, include_secrets: bool = False) -> dict:
         """Сериализация объекта в словарь."""
@@ -262,16 +447,20 @@ class Exchange(db.Model):
             'testnet': self.testnet,
             'rate_limit': self.rate_limit,
             'timeout': self.timeout,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': _iso(self.created_at),
+            'updated_at': _iso(self.updated_at)
         }
         
         if include_secrets:
-            data.update({
-                'api_key': self.get_api_key(),
-                'api_secret': '••••••••' if self.get_api_secret() else '',
-                'password': '••••••••' if self.get_password() else ''
-            })
+            if self._has_any_secret:
+                data.update({
+                    'api_key': self.get_api_key(),
+                    'api_secret': '••••••••' if self.get_api_secret() else '',
+                    'password': '••••••••' if self.get_password() else ''
+                })
+            else:
+                # Ключи не заданы — объект шифрования не нужен
+                data.update({'api_key': '', 'api_secret': '', 'password': ''})
         
         return data
     
@@ -311,31 +500,36 @@ class ArbitrageConfig(db.Model):
     telegram_chat_id = db.Column(db.String(50), nullable=True)
     telegram_bot_token_encrypted = db.Column(db.Text, nullable=True)
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = db.Column(db.DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
     is_active = db.Column(db.Boolean, default=True)
     
+    # Поля to_dict, которые отдаются как есть (одним вызовом attrgetter)
+    _DICT_FIELDS = (
+        'id',
+        'name',
+        'description',
+        'open_threshold',
+        'close_threshold',
+        'min_spread',
+        'max_spread',
+        'update_interval',
+        'order_timeout',
+        'recovery_delay',
+        'max_position_size',
+        'stop_loss_threshold',
+        'take_profit_threshold',
+        'enable_telegram_alerts',
+        'is_active',
+    )
+    _dict_values = attrgetter(*_DICT_FIELDS)
+    
     def to_dict(self) -> dict:
         """Сериализация объекта в словарь."""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'open_threshold': self.open_threshold,
-            'close_threshold': self.close_threshold,
-            'min_spread': self.min_spread,
-            'max_spread': self.max_spread,
-            'update_interval': self.update_interval,
-            'order_timeout': self.order_timeout,
-            'recovery_delay': self.recovery_delay,
-            'max_position_size': self.max_position_size,
-            'stop_loss_threshold': self.stop_loss_threshold,
-            'take_profit_threshold': self.take_profit_threshold,
-            'enable_telegram_alerts': self.enable_telegram_alerts,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        data = dict(zip(self._DICT_FIELDS, self._dict_values(self)))
+        data['created_at'] = _iso(self.created_at)
+        data['updated_at'] = _iso(self.updated_at)
+        return data
 
 
 # ==================== ТОРГОВЫЕ ПАРЫ ====================
@@ -344,6 +538,11 @@ class TradingPair(db.Model):
     """Модель для хранения торговых пар и их настроек."""
     
     __tablename__ = 'trading_pairs'
+    __table_args__ = (
+        # get_enabled_pairs / get_major_pairs: WHERE + ORDER BY priority по индексу
+        db.Index('ix_tp_enabled_priority', 'enabled', 'priority'),
+        db.Index('ix_tp_enabled_category_priority', 'enabled', 'category', 'priority'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     symbol = db.Column(db.String(50), nullable=False, unique=True)
@@ -362,23 +561,28 @@ class TradingPair(db.Model):
     # Категория пары
     category = db.Column(db.String(50), default='major')
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=utcnow(), server_default=utcnow())
+    
+    # Поля to_dict, которые отдаются как есть (одним вызовом attrgetter)
+    _DICT_FIELDS = (
+        'id',
+        'symbol',
+        'base_asset',
+        'quote_asset',
+        'enabled',
+        'min_amount',
+        'max_amount',
+        'precision',
+        'priority',
+        'category',
+    )
+    _dict_values = attrgetter(*_DICT_FIELDS)
     
     def to_dict(self) -> dict:
         """Сериализация объекта в словарь."""
-        return {
-            'id': self.id,
-            'symbol': self.symbol,
-            'base_asset': self.base_asset,
-            'quote_asset': self.quote_asset,
-            'enabled': self.enabled,
-            'min_amount': self.min_amount,
-            'max_amount': self.max_amount,
-            'precision': self.precision,
-            'priority': self.priority,
-            'category': self.category,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        data = dict(zip(self._DICT_FIELDS, self._dict_values(self)))
+        data['created_at'] = _iso(self.created_at)
+        return data
     
     @classmethod
     def get_enabled_pairs(cls):
@@ -397,6 +601,12 @@ class TradeLog(db.Model):
     """Модель для логирования всех сделок."""
     
     __tablename__ = 'trade_logs'
+    __table_args__ = (
+        db.Index('ix_trade_logs_timestamp', 'timestamp'),
+        # История по паре за период: WHERE pair = ? AND timestamp BETWEEN ... ORDER BY timestamp
+        db.Index('ix_trade_logs_pair_timestamp', 'pair', 'timestamp'),
+        db.Index('ix_trade_logs_status', 'status'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     
@@ -418,11 +628,11 @@ class TradeLog(db.Model):
     # Комиссии
     fee_buy = db.Column(db.Float, default=0.0)
     fee_sell = db.Column(db.Float, default=0.0)
-    fee_total = db.Column(db.Float, default=0.0)
+    # Общая комиссия не хранится: to_dict считает fee_buy + fee_sell
     
     # Время
     execution_time = db.Column(db.Float)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=utcnow(), server_default=utcnow())
     
     # Статус
     status = db.Column(db.String(20), default='completed')
@@ -434,41 +644,64 @@ class TradeLog(db.Model):
     # Дополнительная информация
     notes = db.Column(db.Text, nullable=True)
     
+    # Поля to_dict, которые отдаются как есть (одним вызовом attrgetter)
+    _DICT_FIELDS = (
+        'id',
+        'pair',
+        'exchange_buy',
+        'exchange_sell',
+        'buy_price',
+        'sell_price',
+        'amount',
+        'spread_percent',
+        'profit',
+        'profit_percent',
+        'fee_buy',
+        'fee_sell',
+        'execution_time',
+        'status',
+        'notes',
+    )
+    _dict_values = attrgetter(*_DICT_FIELDS)
+    
     def to_dict(self) -> dict:
         """Сериализация объекта в словарь."""
-        return {
-            'id': self.id,
-            'pair': self.pair,
-            'exchange_buy': self.exchange_buy,
-            'exchange_sell': self.exchange_sell,
-            'buy_price': self.buy_price,
-            'sell_price': self.sell_price,
-            'amount': self.amount,
-            'spread_percent': self.spread_percent,
-            'profit': self.profit,
-            'profit_percent': self.profit_percent,
-            'fee_buy': self.fee_buy,
-            'fee_sell': self.fee_sell,
-            'fee_total': self.fee_total,
-            'execution_time': self.execution_time,
-            'status': self.status,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
-            'notes': self.notes
-        }
+        data = dict(zip(self._DICT_FIELDS, self._dict_values(self)))
+        data['fee_total'] = (self.fee_buy or 0.0) + (self.fee_sell or 0.0)
+        data['timestamp'] = _iso(self.timestamp)
+        return data
+
+
+# ==================== СОСТОЯНИЕ СХЕМЫ ====================
+
+class SchemaVersion(db.Model):
+    """Служебная таблица из одной строки: заполнены ли базовые данные."""
+    
+    __tablename__ = 'schema_version'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    seeded = db.Column(db.Boolean, nullable=False, default=False)
 
 
 # ==================== ИНИЦИАЛИЗАЦИЯ ДАННЫХ ====================
 
 def init_default_data():
     """Инициализация базовых данных при первом запуске."""
+    # Быстрый путь при повторных запусках: один SELECT по первичному ключу
+    state = db.session.get(SchemaVersion, 1)
+    if state is not None and state.seeded:
+        return
+    
+    new_objects = []
+    
     # Конфигурация арбитража по умолчанию
     default_config = ArbitrageConfig.query.filter_by(name='default').first()
     if not default_config:
-        default_config = ArbitrageConfig(
+        new_objects.append(ArbitrageConfig(
             name='default',
             description='Конфигурация арбитража по умолчанию'
-        )
-        db.session.add(default_config)
+        ))
     
     # Основные торговые пары
     major_pairs = [
@@ -484,17 +717,25 @@ def init_default_data():
         ('LINK/USDT', 'LINK', 'USDT', 'major', 1),
     ]
     
-    for symbol, base, quote, category, priority in major_pairs:
-        pair = TradingPair.query.filter_by(symbol=symbol).first()
-        if not pair:
-            pair = TradingPair(
-                symbol=symbol,
-                base_asset=base,
-                quote_asset=quote,
-                category=category,
-                priority=priority
-            )
-            db.session.add(pair)
+    # Один запрос на все уже существующие пары вместо SELECT на каждую
+    existing = set(db.session.scalars(
+        db.select(TradingPair.symbol)
+        .where(TradingPair.symbol.in_([p[0] for p in major_pairs]))
+    ))
+    # Пары вставляются одним executemany INSERT (insertmanyvalues) без создания ORM-объектов
+    new_pairs = [
+        {
+            'symbol': symbol,
+            'base_asset': base,
+            'quote_asset': quote,
+            'category': category,
+            'priority': priority
+        }
+        for symbol, base, quote, category, priority in major_pairs
+        if symbol not in existing
+    ]
+    if new_pairs:
+        db.session.execute(db.insert(TradingPair), new_pairs)
     
     # Тестовый пользователь
     if User.query.count() == 0:
@@ -503,8 +744,15 @@ def init_default_data():
             email='admin@example.com'
         )
         test_user.set_password('admin')
-        db.session.add(test_user)
+        new_objects.append(test_user)
+    
+    # Отметка о заполнении — в той же транзакции, что и сами данные
+    if state is None:
+        new_objects.append(SchemaVersion(id=1, seeded=True))
+    else:
+        state.seeded = True
     
+    db.session.add_all(new_objects)
     db.session.commit()
 
 
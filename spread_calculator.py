@@ -1,10 +1,10 @@
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 import numpy as np
-import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
 
-@dataclass
+@dataclass(slots=True)
 class SpreadResult:
     pair: str
     exchange1: str
@@ -21,6 +21,12 @@ class SpreadCalculator:
     def __init__(self, thresholds: dict, colors: dict):
         self.thresholds = thresholds
         self.colors = colors
+        # Resolved once: get_color runs for every SpreadResult
+        self._high = thresholds.get('high', 1.0)
+        self._medium = thresholds.get('medium', 0.5)
+        self._high_color = colors.get('high', '#22c55e')
+        self._medium_color = colors.get('medium', '#eab308')
+        self._low_color = colors.get('low', '#6b7280')
 
     def calculate_arbitrage_spread(self, buy_ask: float, sell_bid: float) -> float:
         """Calculate arbitrage spread: buy at ask on one exchange, sell at bid on another.
@@ -30,43 +36,48 @@ class SpreadCalculator:
         return ((sell_bid - buy_ask) / buy_ask) * 100
 
     def get_color(self, spread_percent: float) -> str:
-        if spread_percent >= self.thresholds.get('high', 1.0):
-            return self.colors.get('high', '#22c55e')
-        elif spread_percent >= self.thresholds.get('medium', 0.5):
-            return self.colors.get('medium', '#eab308')
+        if spread_percent >= self._high:
+            return self._high_color
+        elif spread_percent >= self._medium:
+            return self._medium_color
         else:
-            return self.colors.get('low', '#6b7280')
+            return self._low_color
 
     def calculate_spreads(self, prices: Dict[str, Dict[str, 'TickerData']], pairs: List[str]) -> List[SpreadResult]:
         results = []
-        exchanges = list(prices.keys())
+        books = list(prices.items())
+        get_color = self.get_color
         
         for pair in pairs:
-            for i, ex1 in enumerate(exchanges):
-                for ex2 in exchanges[i+1:]:
-                    ticker1 = prices.get(ex1, {}).get(pair)
-                    ticker2 = prices.get(ex2, {}).get(pair)
-                    
-                    if not ticker1 or not ticker2:
+            # Only exchanges that quote the pair, in the original exchange order
+            quoted = [(ex, book[pair]) for ex, book in books if book.get(pair)]
+            
+            for i, (ex1, ticker1) in enumerate(quoted):
+                t1b, t1a = ticker1.bid, ticker1.ask
+                for ex2, ticker2 in quoted[i+1:]:
+                    t2b, t2a = ticker2.bid, ticker2.ask
+                    # Tickers built from partial responses (e.g. bookTicker) may lack bid/ask:
+                    # no quote means no spread row, not a 0% one
+                    if t1b is None or t1a is None or t2b is None or t2a is None:
                         continue
                     
                     spread1 = 0.0
                     spread2 = 0.0
                     
-                    if ticker2.ask > 0 and ticker1.bid > 0:
-                        spread1 = self.calculate_arbitrage_spread(ticker2.ask, ticker1.bid)
+                    if t2a > 0 and t1b > 0:
+                        spread1 = self.calculate_arbitrage_spread(t2a, t1b)
                         
-                    if ticker1.ask > 0 and ticker2.bid > 0:
-                        spread2 = self.calculate_arbitrage_spread(ticker1.ask, ticker2.bid)
+                    if t1a > 0 and t2b > 0:
+                        spread2 = self.calculate_arbitrage_spread(t1a, t2b)
                     
                     if spread1 > spread2:
                         spread = spread1
                         buy_ex, sell_ex = ex2, ex1
-                        buy_price, sell_price = ticker2.ask, ticker1.bid
+                        buy_price, sell_price = t2a, t1b
                     else:
                         spread = spread2
                         buy_ex, sell_ex = ex1, ex2
-                        buy_price, sell_price = ticker1.ask, ticker2.bid
+                        buy_price, sell_price = t1a, t2b
                     
                     results.append(SpreadResult(
                         pair=pair,
@@ -77,37 +88,69 @@ class SpreadCalculator:
                         ask_exchange=buy_ex,
                         bid_price=sell_price,
                         ask_price=buy_price,
-                        color=self.get_color(spread)
+                        color=get_color(spread)
                     ))
         
         return results
 
 
+def _rolling(values: np.ndarray, window: int, func) -> np.ndarray:
+    """Rolling reduction aligned like pandas ``rolling(window)``: NaN until the window is full."""
+    out = np.full(len(values), np.nan)
+    if 0 < window <= len(values):
+        out[window - 1:] = func(sliding_window_view(values, window), axis=1)
+    return out
+
+
+def _as_list(column, start: int) -> list:
+    """Tail of a column as a list of plain Python scalars; NaN becomes None (JSON has no NaN)."""
+    if isinstance(column, np.ndarray):
+        tail = column[start:]
+        if tail.dtype.kind == 'f' and np.isnan(tail).any():
+            return [None if value != value else value for value in tail.tolist()]
+        return tail.tolist()
+    return [None if value != value else value for value in column[start:]]
+
+
 class StochasticCalculator:
     def __init__(self, k_period: int = 14, d_period: int = 3, smooth: int = 3):
         self.k_period = k_period
         self.d_period = d_period
         self.smooth = smooth
 
-    def calculate(self, klines: List[dict]) -> Dict[str, List[float]]:
-        if len(klines) < self.k_period:
-            return {'k': [], 'd': [], 'timestamps': []}
+    def calculate(self, klines) -> Dict[str, List[float]]:
+        """Accepts a list of kline dicts or a dict of columns (see ExchangeManager.fetch_klines)."""
+        if isinstance(klines, dict):
+            columns = klines
+        else:
+            columns = {name: [row[name] for row in klines] for name in (klines[0] if klines else ())}
+        length = len(columns['close']) if columns else 0
+        if length < self.k_period:
+            return {'k': [], 'd': [], 'timestamps': [], 'prices': [], 'ohlc': []}
         
-        df = pd.DataFrame(klines)
+        low = np.asarray(columns['low'], dtype=float)
+        high = np.asarray(columns['high'], dtype=float)
+        close = np.asarray(columns['close'], dtype=float)
         
-        low_min = df['low'].rolling(window=self.k_period).min()
-        high_max = df['high'].rolling(window=self.k_period).max()
+        low_min = _rolling(low, self.k_period, np.min)
+        high_max = _rolling(high, self.k_period, np.max)
         
-        k_raw = 100 * (df['close'] - low_min) / (high_max - low_min)
-        k = k_raw.rolling(window=self.smooth).mean()
-        d = k.rolling(window=self.d_period).mean()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k_raw = 100 * (close - low_min) / (high_max - low_min)
+        k = _rolling(k_raw, self.smooth, np.mean)
+        d = _rolling(k, self.d_period, np.mean)
         
         valid_idx = max(self.k_period + self.smooth + self.d_period - 3, 0)
+        k = k[valid_idx:]
+        d = d[valid_idx:]
+        
+        names = list(columns)
+        tails = [_as_list(columns[name], valid_idx) for name in names]
         
         return {
-            'k': k.iloc[valid_idx:].fillna(50).tolist(),
-            'd': d.iloc[valid_idx:].fillna(50).tolist(),
-            'timestamps': df['timestamp'].iloc[valid_idx:].tolist(),
-            'prices': df['close'].iloc[valid_idx:].tolist(),
-            'ohlc': df.iloc[valid_idx:].to_dict('records')
+            'k': np.where(np.isnan(k), 50.0, k).tolist(),
+            'd': np.where(np.isnan(d), 50.0, d).tolist(),
+            'timestamps': _as_list(columns['timestamp'], valid_idx),
+            'prices': _as_list(columns['close'], valid_idx),
+            'ohlc': [dict(zip(names, row)) for row in zip(*tails)]
         }